@@ -2,18 +2,47 @@ import streamlit as st
 import gspread
 from google.oauth2.service_account import Credentials
 import pandas as pd
+import numpy as np
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-import time
 import urllib.parse
 import re
 import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 import xml.etree.ElementTree as ET
 import google.generativeai as genai
 from dotenv import load_dotenv
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
+from instructor_search_engine import (
+    SPREADSHEET_ID,
+    SHEET_SOURCE_TIMEOUTS,
+    SHEET_SOURCE_LABELS,
+    FACET_LABELS,
+    RANK_TOP_K,
+    InstructorDataset,
+    InstructorStore,
+    ROSTER_STATUS_LABELS,
+    SNAPSHOT_PATH,
+    fetch_instructor_data,
+    frame_from_sheet_values,
+    get_csv_sheet_sources,
+    guess_roster_columns,
+    match_roster,
+    read_roster_file,
+    roster_report,
+    prepare_instructor_frame,
+    resolve_ranked,
+    run_search,
+)
 
 # 환경 변수 로드
 load_dotenv()
@@ -401,10 +430,12 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# 서비스 계정 연결에 실패한 뒤 다시 연결을 시도하기까지의 시간(초)
+GOOGLE_SHEET_RETRY_INTERVAL = 60
+
 # Google Sheets 연결 함수
-@st.cache_resource
-def get_google_sheet():
-    """구글 시트에 연결"""
+def connect_google_sheet():
+    """구글 시트에 연결 (서비스 계정 키가 없거나 연결에 실패하면 None)"""
     try:
         current_dir = os.path.dirname(os.path.abspath(__file__))
         SERVICE_ACCOUNT_FILE = os.path.join(current_dir, 'huhsame-service-account-key.json')
@@ -420,7 +451,7 @@ def get_google_sheet():
         )
         
         client = gspread.authorize(credentials)
-        SPREADSHEET_ID = '1-EaykQMr06Qm9FWDOJX3CVbAZylGom1G'
+        client.set_timeout(SHEET_SOURCE_TIMEOUTS['gspread'])
         spreadsheet = client.open_by_key(SPREADSHEET_ID)
         worksheet = spreadsheet.get_worksheet(0)
         
@@ -430,99 +461,799 @@ def get_google_sheet():
     except Exception as e:
         return None
 
-@st.cache_data(ttl=3600)
-def load_instructor_data():
-    """구글 시트에서 강사 데이터 로드"""
-    # 방법 1: CSV URL로 공개 데이터 접근 시도
+class GoogleSheetConnection:
+    """
+    서비스 계정 워크시트를 처음 사용할 때 연결하여 재사용하는 객체 (잠금으로 보호, Streamlit 캐시 미사용)
+    
+    데이터 소스 작업 스레드와 백그라운드 갱신 스레드에서 호출됩니다. 연결에 실패하면 실패를 영구히
+    기억하지 않고, GOOGLE_SHEET_RETRY_INTERVAL이 지난 뒤 호출될 때 다시 연결을 시도합니다.
+    """
+    
+    def __init__(self, retry_interval=GOOGLE_SHEET_RETRY_INTERVAL):
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._worksheet = None
+        self._failed_at = None  # 마지막 연결 실패 시각 (time.monotonic)
+    
+    def worksheet(self):
+        """
+        연결된 워크시트 반환 (연결할 수 없으면 None)
+        """
+        with self._lock:
+            if self._worksheet is None and (
+                self._failed_at is None or time.monotonic() - self._failed_at >= self.retry_interval
+            ):
+                self._worksheet = connect_google_sheet()
+                self._failed_at = None if self._worksheet is not None else time.monotonic()
+            return self._worksheet
+
+@st.cache_resource
+def get_google_sheet_connection():
+    """
+    프로세스 전체에서 하나의 서비스 계정 연결 객체를 사용 (스크립트 스레드에서만 호출)
+    """
+    return GoogleSheetConnection()
+
+def fetch_sheet_gspread(connection, timeout):
+    """
+    서비스 계정(gspread)으로 시트 데이터를 가져오는 함수 (timeout은 connect_google_sheet에서 설정)
+    """
+    worksheet = connection.worksheet()
+    if worksheet is None:
+        return pd.DataFrame()
+    
+    # CSV 내보내기 소스와 같은 형태(컬럼 타입, 빈 값 NaN)로 변환
+    return frame_from_sheet_values(worksheet.get_all_values())
+
+def get_sheet_sources(connection):
+    """
+    시트 데이터 소스 목록 (이름 → timeout을 받아 데이터프레임을 반환하는 함수)
+    CSV 내보내기(gid 지정), 서비스 계정(gspread), CSV 내보내기(gid 없음)를 동시에 시도합니다.
+    connection: GoogleSheetConnection (작업 스레드에서 Streamlit 캐시 함수를 호출하지 않도록 미리 전달)
+    """
+    csv_sources = get_csv_sheet_sources()
+    return {
+        'csv_gid': csv_sources['csv_gid'],
+        'gspread': lambda timeout: fetch_sheet_gspread(connection, timeout),
+        'csv': csv_sources['csv'],
+    }
+
+def fetch_sheet_revision(connection):
+    """
+    시트의 리비전 표시(Drive modifiedTime)를 가져오는 함수
+    서비스 계정 연결이 없거나 조회에 실패하면 None을 반환합니다.
+    """
     try:
-        SPREADSHEET_ID = '1-EaykQMr06Qm9FWDOJX3CVbAZylGom1G'
-        csv_url = f'https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/export?format=csv&gid=0'
-        df = pd.read_csv(csv_url)
-        
-        if not df.empty:
-            df.columns = df.columns.str.strip()
-            return df
-    except:
-        pass
+        worksheet = connection.worksheet()
+        if worksheet is None:
+            return None
+        return worksheet.spreadsheet.get_lastUpdateTime()
+    except Exception:
+        return None
+
+@st.cache_resource
+def get_instructor_store():
+    """
+    프로세스 전체에서 하나의 강사 데이터 보관소를 사용
+    (갱신은 백그라운드 스레드에서 실행되므로 서비스 계정 연결 객체를 여기서 꺼내 전달)
+    """
+    connection = get_google_sheet_connection()
+    return InstructorStore(
+        lambda: fetch_instructor_data(get_sheet_sources(connection)),
+        check_revision=lambda: fetch_sheet_revision(connection),
+    ).start()
+
+def load_instructor_dataset():
+    """
+    강사 데이터셋(데이터, 컬럼 스키마, 검색 색인, 통계) 로드
+    확인 주기가 지났으면 최신 데이터 갱신을 백그라운드에서 시작합니다.
+    """
+    store = get_instructor_store()
+    store.maybe_refresh()
+    return store.dataset
+
+@st.cache_resource(max_entries=4)
+def get_uploaded_dataset(_df, data_version):
+    """
+    업로드한 CSV 데이터의 데이터셋(스키마, 색인, 통계)을 데이터 버전별로 한 번만 생성
+    """
+    return InstructorDataset.build(_df)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def get_roster_report(_dataset, data_version, names, emails):
+    """
+    명단 일괄 조회 결과 표 (데이터 버전과 명단이 같으면 다시 대조하지 않음)
+    """
+    return roster_report(_dataset, match_roster(_dataset, names, emails))
+
+def parse_roster_text(text):
+    """
+    붙여넣은 명단 텍스트를 (이름 목록, 이메일 목록)으로 나누는 함수
+    한 줄에 한 명이며, 쉼표나 탭 뒤의 값은 이메일로 사용합니다.
+    """
+    names, emails = [], []
+    for line in text.splitlines():
+        parts = [part.strip() for part in re.split(r'[,\t]', line, maxsplit=1)]
+        if not parts[0] and len(parts) == 1:
+            continue
+        names.append(parts[0])
+        emails.append(parts[1] if len(parts) > 1 and parts[1] else None)
+    return names, emails
+
+def get_search_result(dataset, query, search_type, ranked=False):
+    """
+    세션에 저장된 검색 결과를 재사용하거나, 키가 다르면 새로 검색하여 저장하는 함수
+    (검색 자체는 instructor_search_engine.run_search에서 실행)
+    """
+    key = (
+        query, search_type, dataset.version, resolve_ranked(query, search_type, ranked, dataset.rank_index),
+        dataset.indexed,
+    )
+    cached = st.session_state.get('search_result')
+    if cached is not None and cached.key == key:
+        return cached
+    
+    result = run_search(dataset, query, search_type, ranked)
+    st.session_state.search_result = result
+    return result
+
+def get_filtered_result(dataset, search_result, facet_selections):
+    """
+    결과 좁히기 선택을 적용한 검색 결과 (선택이 같으면 세션에 저장된 결과 재사용)
+    관련도순 검색은 필터를 적용한 뒤 상위 강사를 다시 뽑으므로, 상위 목록 밖의 강사도 필터 결과에 포함됩니다.
+    """
+    if not any(facet_selections.values()):
+        return search_result
+    
+    key = (search_result.key, tuple((facet, tuple(values)) for facet, values in facet_selections.items()))
+    cached = st.session_state.get('filtered_search_result')
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
+    facet_mask = dataset.facets.mask(facet_selections, len(dataset.frame))
+    result = run_search(dataset, search_result.query, search_result.search_type, search_result.ranked, facet_mask)
+    st.session_state.filtered_search_result = (key, result)
+    return result
+
+# 외부 웹 요청(네이버, 유튜브) 공통 헤더 (봇 차단 방지를 위해 브라우저와 같은 헤더 사용)
+# Accept-Encoding은 requests 기본값 사용 (gzip/deflate, brotli 패키지가 설치되어 있으면 br 포함)
+WEB_REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+}
+
+# 연결 풀 크기 (연결을 유지할 호스트 수, 호스트당 최대 동시 연결 수)
+HTTP_POOL_HOSTS = 10
+HTTP_MAX_CONNECTIONS_PER_HOST = 4
+
+# 연결 실패 시 재시도 횟수 (응답을 받은 뒤에는 재시도하지 않음)
+HTTP_CONNECT_RETRIES = 1
+
+@st.cache_resource
+def get_http_adapter():
+    """
+    외부 웹 요청이 공유하는 연결 풀 (호스트별 keep-alive 연결을 프로세스 전체에서 재사용)
+    호스트당 HTTP_MAX_CONNECTIONS_PER_HOST개까지 연결을 유지합니다. 풀이 모두 사용 중이면 기다리지 않고
+    임시 연결을 열어 보내고 사용 후 닫습니다. (풀 대기로 요청 timeout을 넘기지 않도록)
+    """
+    return HTTPAdapter(
+        pool_connections=HTTP_POOL_HOSTS,
+        pool_maxsize=HTTP_MAX_CONNECTIONS_PER_HOST,
+        pool_block=False,
+        max_retries=Retry(total=HTTP_CONNECT_RETRIES, connect=HTTP_CONNECT_RETRIES, read=0, status=0, backoff_factor=0.2),
+    )
+
+# 외부 웹 응답 디스크 캐시 파일 경로 (SQLite, 환경 변수로 변경 가능)
+HTTP_CACHE_PATH = os.getenv('INSTRUCTOR_HTTP_CACHE_PATH') or os.path.join(
+    os.path.dirname(SNAPSHOT_PATH), 'http_cache.sqlite'
+)
+
+# 응답 캐시 유지 시간(초) - (호스트, 경로 접두사, 유지 시간), 위에서부터 처음 일치하는 항목 사용
+# 목록에 없는 URL은 캐시하지 않습니다.
+HTTP_CACHE_TTLS = (
+    ('search.naver.com', '/', 24 * 3600),              # 네이버 인물검색
+    ('youtube.com', '/api/timedtext', 7 * 24 * 3600),  # 자막 (거의 바뀌지 않음)
+    ('youtube.com', '/watch', 24 * 3600),              # 동영상 페이지
+    ('youtube.com', '/results', 6 * 3600),             # 유튜브 검색 결과
+    ('youtube.com', '/', 6 * 3600),                    # 채널 페이지, 최신 동영상 목록
+)
+
+# 캐시 파일 최대 크기 (초과하면 가장 오래 사용하지 않은 응답부터 삭제)
+HTTP_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# 이보다 큰 응답은 캐시하지 않음
+HTTP_CACHE_MAX_ENTRY_BYTES = 8 * 1024 * 1024
+
+# 캐시 적중 시 마지막 사용 시각(LRU)을 다시 기록하는 최소 간격(초) - 적중마다 쓰기를 하지 않도록
+HTTP_CACHE_TOUCH_INTERVAL = 3600
+
+def normalize_cache_url(url):
+    """
+    캐시 키로 쓸 URL 정규화 (스킴/호스트 소문자, 쿼리 파라미터 정렬, 프래그먼트 제거)
+    """
+    parts = urllib.parse.urlsplit(url)
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True)))
+    return urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', query, ''))
+
+def host_in_domain(host, domain):
+    # host가 domain 자체이거나 그 하위 도메인인지 (예: m.search.naver.com → naver.com)
+    return host == domain or host.endswith('.' + domain)
+
+def http_cache_ttl(url):
+    """
+    URL의 응답 캐시 유지 시간(초) (캐시 대상이 아니면 None)
+    """
+    parts = urllib.parse.urlsplit(url)
+    host = (parts.hostname or '').lower()
+    for domain, path_prefix, ttl in HTTP_CACHE_TTLS:
+        if host_in_domain(host, domain) and (parts.path or '/').startswith(path_prefix):
+            return ttl
+    return None
+
+class HTTPResponseCache:
+    """
+    외부 웹 응답(GET 200)을 저장하는 SQLite 디스크 캐시 (앱을 재시작해도 유지, 여러 세션이 공유)
+    
+    유지 시간이 지나지 않은 응답은 네트워크 없이 바로 돌려주고, 지난 응답은 ETag/Last-Modified가
+    있으면 조건부 요청(304 Not Modified)으로 다시 확인합니다. 파일 크기가 max_bytes를 넘으면
+    마지막 사용 시각이 가장 오래된 응답부터 삭제합니다(LRU).
+    캐시 읽기/쓰기에 실패하면 캐시가 없는 것처럼 동작합니다.
+    
+    전체 크기는 저장/삭제할 때 누적해서 관리하고(최대 크기를 넘었을 때만 다시 합산), 마지막 사용
+    시각은 HTTP_CACHE_TOUCH_INTERVAL보다 오래된 경우에만 기록하여 적중 시에는 쓰기를 하지 않습니다.
+    """
     
-    # 방법 2: 서비스 계정을 통한 gspread 사용
+    def __init__(self, path=HTTP_CACHE_PATH, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+    
+    def get(self, key):
+        """
+        저장된 응답 (없으면 None) - {'response', 'fresh', 'etag', 'last_modified'}
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT status, headers, body, etag, last_modified, expires_at, accessed_at FROM responses WHERE key = ?',
+                    (key,),
+                ).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                if now - row[6] >= HTTP_CACHE_TOUCH_INTERVAL:
+                    self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+        except sqlite3.Error:
+            return None
+        
+        status, headers, body, etag, last_modified, expires_at, _ = row
+        response = requests.Response()
+        response.status_code = status
+        response.headers = requests.structures.CaseInsensitiveDict(json.loads(headers))
+        response._content = body
+        response.url = key
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.reason = 'OK'
+        response.from_cache = True
+        return {
+            'response': response,
+            'fresh': time.time() < expires_at,
+            'etag': etag,
+            'last_modified': last_modified,
+        }
+    
+    def put(self, key, response, ttl):
+        """
+        응답 저장 (본문은 압축을 푼 상태로 저장하므로 전송 관련 헤더는 제외)
+        """
+        body = response.content
+        if len(body) > HTTP_CACHE_MAX_ENTRY_BYTES:
+            return
+        headers = {
+            name: value for name, value in response.headers.items()
+            if name.lower() not in ('content-encoding', 'content-length', 'transfer-encoding', 'set-cookie')
+        }
+        now = time.time()
+        try:
+            with self._lock:
+                previous = self._conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (key, response.status_code, json.dumps(headers), body, response.headers.get('ETag'),
+                     response.headers.get('Last-Modified'), now + ttl, now, len(body)),
+                )
+                self._total_bytes += len(body) - (previous[0] if previous else 0)
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+        except sqlite3.Error:
+            pass
+    
+    def refresh(self, key, ttl):
+        """
+        조건부 요청에서 304를 받은 응답의 유지 시간을 연장
+        """
+        try:
+            with self._lock:
+                now = time.time()
+                self._conn.execute(
+                    'UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?', (now + ttl, now, key)
+                )
+        except sqlite3.Error:
+            pass
+    
+    def _evict(self):
+        # 최대 크기를 넘으면 오래 사용하지 않은 응답부터 삭제 (최대 크기의 90%까지)
+        # 다른 프로세스가 같은 파일을 쓸 수 있으므로 삭제 전에만 실제 크기를 다시 합산
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        self._total_bytes = total
+        if total <= self.max_bytes:
+            return
+        target = total - self.max_bytes * 0.9
+        removed = 0
+        keys = []
+        for key, size in self._conn.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+            keys.append((key,))
+            removed += size
+            if removed >= target:
+                break
+        self._conn.executemany('DELETE FROM responses WHERE key = ?', keys)
+        self._total_bytes = total - removed
+    
+    def stats(self):
+        """
+        저장된 응답 수와 전체 크기(바이트)
+        """
+        try:
+            with self._lock:
+                count, size = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+            return {'entries': count, 'bytes': size}
+        except sqlite3.Error:
+            return {'entries': 0, 'bytes': 0}
+
+# 호스트별 요청 속도 제한 - 도메인: (초당 요청 수, 한 번에 몰아서 보낼 수 있는 요청 수)
+# 모든 세션이 함께 사용하며, 목록에 없는 호스트는 제한하지 않습니다.
+HOST_RATE_LIMITS = {
+    'youtube.com': (2.0, 5),
+    'naver.com': (1.0, 3),
+}
+
+# 속도 제한에 걸렸을 때 기다릴 최대 시간(초) - 더 기다려야 하면 바로 실패
+HOST_RATE_LIMIT_MAX_WAIT = 2.0
+
+# 연속으로 이만큼 실패하면 해당 호스트 요청을 잠시 중단 (서킷 브레이커)
+HOST_FAILURE_THRESHOLD = 3
+
+# 요청 중단 시간(초) - 중단 후 첫 요청이 다시 실패할 때마다 두 배로 늘림 (최대값까지)
+HOST_BACKOFF_SECONDS = 10
+HOST_BACKOFF_MAX_SECONDS = 300
+
+# 실패로 보는 응답 상태 코드 (요청 제한, 서버 오류)
+HOST_FAILURE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class HostUnavailableError(requests.exceptions.ConnectionError):
+    """
+    호스트 요청이 중단되었거나 속도 제한 대기 시간이 너무 길어 요청을 보내지 않은 경우
+    """
+
+class HostGuard:
+    """
+    호스트별 토큰 버킷 속도 제한과 서킷 브레이커 (프로세스 전체 공유, 스레드 안전)
+    
+    요청마다 토큰을 하나 쓰고, 토큰은 초당 요청 수만큼 다시 채워집니다. 토큰이 없으면
+    HOST_RATE_LIMIT_MAX_WAIT까지만 기다립니다. 연속 실패(타임아웃, 429/5xx, 동의 페이지)가
+    HOST_FAILURE_THRESHOLD에 도달하면 중단 시간 동안 요청을 보내지 않고 바로 HostUnavailableError를
+    냅니다. 중단 시간이 지나면 요청 하나만 시험 삼아 보내고, 성공하면 정상으로 돌아가고 실패하면
+    중단 시간을 두 배로 늘립니다. (429의 Retry-After가 더 길면 그 값을 따름)
+    """
+    
+    def __init__(self, limits=HOST_RATE_LIMITS):
+        self.limits = limits
+        self._lock = threading.Lock()
+        self._hosts = {}
+    
+    def domain(self, url):
+        """
+        URL이 속한 제한 대상 도메인 (대상이 아니면 None)
+        """
+        host = (urllib.parse.urlsplit(url).hostname or '').lower()
+        for domain in self.limits:
+            if host_in_domain(host, domain):
+                return domain
+        return None
+    
+    def _state(self, domain):
+        state = self._hosts.get(domain)
+        if state is None:
+            rate, burst = self.limits[domain]
+            state = self._hosts[domain] = {
+                'tokens': float(burst),
+                'updated_at': time.monotonic(),
+                'failures': 0,
+                'trips': 0,
+                'open_until': 0.0,
+                'probing': False,
+            }
+        return state
+    
+    def acquire(self, domain):
+        """
+        요청을 보내기 전 호출 (필요하면 토큰이 채워질 때까지 대기)
+        요청이 중단된 상태이거나 대기 시간이 너무 길면 HostUnavailableError
+        """
+        rate, burst = self.limits[domain]
+        with self._lock:
+            state = self._state(domain)
+            now = time.monotonic()
+            if state['trips']:
+                if now < state['open_until'] or state['probing']:
+                    raise HostUnavailableError(f"{domain} 응답 이상으로 요청을 잠시 중단했습니다")
+                # 중단 시간이 지나면 이 요청 하나로 회복 여부 확인
+                state['probing'] = True
+            
+            state['tokens'] = min(burst, state['tokens'] + (now - state['updated_at']) * rate)
+            state['updated_at'] = now
+            wait = max(0.0, (1 - state['tokens']) / rate)
+            if wait > HOST_RATE_LIMIT_MAX_WAIT:
+                state['probing'] = False
+                raise HostUnavailableError(f"{domain} 요청이 너무 많습니다")
+            state['tokens'] -= 1
+        if wait:
+            time.sleep(wait)
+    
+    def record(self, domain, success, retry_after=None):
+        """
+        요청 결과 기록 (성공하면 실패 횟수 초기화, 연속 실패가 쌓이면 요청 중단)
+        """
+        with self._lock:
+            state = self._state(domain)
+            if success:
+                state.update(failures=0, trips=0, open_until=0.0, probing=False)
+                return
+            state['failures'] += 1
+            if state['probing'] or state['failures'] >= HOST_FAILURE_THRESHOLD or retry_after:
+                state['trips'] += 1
+                backoff = min(HOST_BACKOFF_MAX_SECONDS, HOST_BACKOFF_SECONDS * 2 ** (state['trips'] - 1))
+                if retry_after:
+                    backoff = max(backoff, min(retry_after, HOST_BACKOFF_MAX_SECONDS))
+                state.update(failures=0, open_until=time.monotonic() + backoff, probing=False)
+    
+    def blocked(self):
+        """
+        요청이 중단된 도메인과 남은 시간(초)
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                domain: state['open_until'] - now
+                for domain, state in self._hosts.items()
+                if state['trips'] and state['open_until'] > now
+            }
+
+@st.cache_resource
+def get_host_guard():
+    """
+    프로세스 전체에서 하나의 호스트별 속도 제한/서킷 브레이커를 사용 (모든 세션 공유)
+    """
+    return HostGuard()
+
+def is_failed_response(response):
+    # 요청 제한/서버 오류 응답이거나 동의(consent) 페이지로 넘어간 경우
+    if response.status_code in HOST_FAILURE_STATUS_CODES:
+        return True
+    host = (urllib.parse.urlsplit(response.url or '').hostname or '').lower()
+    return host.startswith('consent.')
+
+def is_cacheable_response(request_url, response):
+    # 다른 호스트로 넘어간 응답(동의/차단 페이지 등)은 원래 URL의 응답으로 저장하지 않음
+    request_host = (urllib.parse.urlsplit(request_url).hostname or '').lower()
+    response_host = (urllib.parse.urlsplit(response.url or '').hostname or '').lower()
+    return response_host == request_host and not is_failed_response(response)
+
+def parse_retry_after(response):
+    # Retry-After 헤더(초 단위)만 해석
     try:
-        worksheet = get_google_sheet()
-        if worksheet is not None:
-            all_values = worksheet.get_all_values()
-            if len(all_values) > 1:
-                df = pd.DataFrame(all_values[1:], columns=all_values[0])
-                if not df.empty:
-                    df.columns = df.columns.str.strip()
-                    return df
-    except:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+class CachedSession(requests.Session):
+    """
+    GET 응답을 HTTPResponseCache에 저장하고 재사용하는 세션
+    캐시 대상(HTTP_CACHE_TTLS)이 아닌 요청과 GET 이외의 요청은 그대로 보냅니다.
+    네트워크 오류가 나면 유지 시간이 지난 응답이라도 저장된 것이 있으면 그것을 돌려줍니다.
+    guard(HostGuard)를 지정하면 실제로 네트워크에 보내는 요청에만 호스트별 속도 제한과
+    서킷 브레이커를 적용합니다. (캐시에서 바로 돌려주는 응답은 제한하지 않음)
+    """
+    
+    def __init__(self, cache=None, guard=None):
+        super().__init__()
+        self.cache = cache
+        self.guard = guard
+    
+    def close(self):
+        # 연결 풀(어댑터)은 모든 세션이 공유하므로 세션을 닫아도 풀은 닫지 않음
         pass
     
-    # 방법 3: CSV URL without gid 파라미터 시도
+    def send_guarded(self, method, url, *args, **kwargs):
+        """
+        호스트별 속도 제한/서킷 브레이커를 거쳐 요청을 보내는 함수
+        """
+        domain = self.guard.domain(url) if self.guard is not None else None
+        if domain is None:
+            return super().request(method, url, *args, **kwargs)
+        
+        self.guard.acquire(domain)
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except BaseException:
+            self.guard.record(domain, success=False)
+            raise
+        failed = is_failed_response(response)
+        self.guard.record(domain, success=not failed, retry_after=parse_retry_after(response) if failed else None)
+        return response
+    
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() != 'GET' or self.cache is None:
+            return self.send_guarded(method, url, *args, **kwargs)
+        
+        full_url = requests.Request(method, url, params=kwargs.get('params')).prepare().url
+        ttl = http_cache_ttl(full_url)
+        if ttl is None:
+            return self.send_guarded(method, url, *args, **kwargs)
+        
+        key = normalize_cache_url(full_url)
+        cached = self.cache.get(key)
+        if cached is not None and cached['fresh']:
+            return cached['response']
+        
+        if cached is not None:
+            # 유지 시간이 지난 응답은 바뀌었는지만 확인 (바뀌지 않았으면 서버가 본문 없이 304 응답)
+            headers = dict(kwargs.pop('headers', None) or {})
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+            kwargs['headers'] = headers
+        
+        try:
+            response = self.send_guarded(method, url, *args, **kwargs)
+        except requests.exceptions.RequestException:
+            if cached is not None:
+                return cached['response']
+            raise
+        
+        if response.status_code == 304 and cached is not None:
+            self.cache.refresh(key, ttl)
+            return cached['response']
+        if response.status_code == 200 and is_cacheable_response(full_url, response):
+            self.cache.put(key, response, ttl)
+        return response
+
+@st.cache_resource
+def get_http_response_cache():
+    """
+    프로세스 전체에서 하나의 외부 웹 응답 디스크 캐시를 사용 (열 수 없으면 None - 캐시 없이 동작)
+    """
     try:
-        SPREADSHEET_ID = '1-EaykQMr06Qm9FWDOJX3CVbAZylGom1G'
-        csv_url = f'https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/export?format=csv'
-        df = pd.read_csv(csv_url)
-        
-        if not df.empty:
-            df.columns = df.columns.str.strip()
-            return df
-    except:
-        pass
+        return HTTPResponseCache()
+    except (OSError, sqlite3.Error):
+        return None
+
+def create_http_session(headers=None, cache=None):
+    """
+    공유 연결 풀을 사용하는 새 HTTP 세션 (헤더/쿠키는 세션마다 따로 관리)
+    cache: HTTPResponseCache (지정하면 GET 응답을 디스크 캐시에서 재사용)
+    유튜브/네이버 요청에는 모든 세션이 공유하는 호스트별 속도 제한과 서킷 브레이커가 적용됩니다.
+    """
+    session = CachedSession(cache, get_host_guard())
+    session.headers.update(WEB_REQUEST_HEADERS if headers is None else headers)
+    adapter = get_http_adapter()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_http_session():
+    """
+    네이버/유튜브 검색과 스크래핑 함수에서 쓸 HTTP 세션 (호출할 때마다 새로 생성)
+    세션(쿠키)은 요청마다 따로 두어 사용자/스레드끼리 동의 쿠키 등을 공유하지 않고, 연결 풀과
+    디스크 캐시만 공유합니다. 같은 호스트로의 요청은 이미 열린 연결(TCP/TLS 핸드셰이크 생략)을
+    재사용하고, 같은 URL의 응답은 유지 시간 동안 디스크 캐시에서 바로 읽습니다.
+    """
+    return create_http_session(cache=get_http_response_cache())
+
+def start_enrichment(fn, *args, **kwargs):
+    """
+    외부 정보 조회(네이버, 유튜브, 자막, Gemini 요약)를 별도 스레드에서 시작하고 Future를 반환하는 함수
+    
+    서로 의존하지 않는 조회를 동시에 시작해 두고 필요한 시점에 result()로 기다리면, 전체 대기 시간이
+    모든 호출 시간의 합이 아니라 가장 긴 의존 체인의 시간이 됩니다.
+    현재 세션의 ScriptRunContext를 스레드에 연결하므로 st.secrets와 캐시 함수를 그대로 사용할 수 있습니다.
+    fn은 화면에 직접 표시(st.warning 등)하지 말고 경고/오류를 결과에 담아 반환해야 합니다.
+    (화면 출력은 호출한 스크립트 스레드에서만 합니다)
+    """
+    future = Future()
     
-    return pd.DataFrame()
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+    
+    thread = threading.Thread(target=run, name=f"enrichment-{getattr(fn, '__name__', 'task')}", daemon=True)
+    add_script_run_ctx(thread)
+    thread.start()
+    return future
 
-def search_instructors(df, query, search_type='all'):
+# 외부 정보 조회 결과 공유 캐시 유지 시간(초) - 결과가 없거나 실패한 경우는 짧게 유지
+ENRICHMENT_CACHE_TTL = 6 * 3600
+ENRICHMENT_CACHE_EMPTY_TTL = 5 * 60
+
+# 공유 캐시에 유지할 최대 결과 수 (초과하면 가장 오래 사용하지 않은 결과부터 삭제)
+ENRICHMENT_CACHE_MAX_ENTRIES = 2000
+
+# 다른 세션이 조회 중인 결과를 기다리는 최대 시간(초) - 넘으면 직접 조회
+ENRICHMENT_WAIT_TIMEOUT = 30
+
+# 공유 캐시 키 종류별 표시 이름
+ENRICHMENT_KIND_LABELS = {
+    'youtube_links': '유튜브 검색',
+    'youtube_summary': '유튜브 요약',
+}
+
+class EnrichmentCache:
     """
-    강사를 검색하는 함수
-    search_type: 'name' (강사이름), 'field' (대분야/소분야), 'subject' (강의 과목), 'all' (전체)
+    유튜브 검색/요약처럼 느린 외부 정보 조회 결과를 모든 세션이 함께 쓰는 메모리 캐시
+    
+    같은 키를 여러 세션이 동시에 요청하면 첫 요청만 실제로 조회하고 나머지는 그 결과를
+    기다립니다(single-flight). 키별로 적중(hits), 조회(misses), 대기(waits) 횟수를 기록합니다.
+    조회 함수는 (값, 성공 여부)를 반환하며, 실패했거나 값이 비어 있으면 empty_ttl 동안만 보관합니다.
+    
+    기다리는 세션은 wait_timeout이 지나면 직접 조회하고, 먼저 조회한 세션이 중단(재실행/정지)되면
+    그 예외를 받지 않고 다시 조회합니다. (일반 조회 오류만 기다리던 세션에 전달)
     """
-    if df.empty or not query:
-        return pd.DataFrame()
     
-    # 검색할 컬럼 찾기
-    name_cols = [col for col in df.columns if '강사' in col and '이름' in col]
-    field_cols = [col for col in df.columns if any(x in col for x in ['대분야', '소분야', '분야'])]
-    subject_cols = [col for col in df.columns if '강의' in col and '과목' in col]
-    
-    # 결과 저장
-    results = pd.DataFrame()
-    
-    # 검색 타입에 따라 필터링
-    if search_type == 'all' or search_type == 'name':
-        for col in name_cols:
-            mask = df[col].astype(str).str.contains(query, case=False, na=False)
-            results = pd.concat([results, df[mask]], ignore_index=True)
-    
-    if search_type == 'all' or search_type == 'field':
-        for col in field_cols:
-            mask = df[col].astype(str).str.contains(query, case=False, na=False)
-            results = pd.concat([results, df[mask]], ignore_index=True)
-    
-    if search_type == 'all' or search_type == 'subject':
-        for col in subject_cols:
-            mask = df[col].astype(str).str.contains(query, case=False, na=False)
-            results = pd.concat([results, df[mask]], ignore_index=True)
-    
-    # 중복 제거 - 이름과 이메일 주소가 같은 경우 동일인물로 판단
-    if not results.empty:
-        # 이름과 이메일 컬럼 찾기 (results DataFrame 기준)
-        result_name_cols = [col for col in results.columns if '강사' in col and '이름' in col]
-        email_cols = [col for col in results.columns if 'e-mail' in col or '이메일' in col]
-        
-        if result_name_cols and email_cols:
-            # 이름과 이메일을 기준으로 중복 제거
-            # 첫 번째 기준: 이름 + 이메일이 모두 같은 경우
-            name_col = result_name_cols[0]
-            email_col = email_cols[0]
-            
-            # 이름과 이메일이 모두 있는 경우에만 중복 제거
-            results = results.drop_duplicates(subset=[name_col, email_col], keep='first')
-        else:
-            # 이름이나 이메일 정보가 없는 경우 일반 중복 제거
-            results = results.drop_duplicates()
+    # 먼저 조회한 세션이 중단되어 기다리던 세션이 다시 조회해야 함을 알리는 값
+    _RETRY = object()
+    
+    def __init__(self, ttl=ENRICHMENT_CACHE_TTL, empty_ttl=ENRICHMENT_CACHE_EMPTY_TTL,
+                 max_entries=ENRICHMENT_CACHE_MAX_ENTRIES, wait_timeout=ENRICHMENT_WAIT_TIMEOUT):
+        self.ttl = ttl
+        self.empty_ttl = empty_ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (값, 만료 시각), 최근 사용한 키가 뒤쪽
+        self._inflight = {}            # key -> 조회 중인 Future
+        self._counters = {}            # key -> {'hits', 'misses', 'waits'}
+    
+    def get_or_fetch(self, key, fn, *args, **kwargs):
+        """
+        key의 결과를 반환 (없거나 만료되었으면 fn(*args, **kwargs)로 조회해서 저장)
+        fn은 (값, 성공 여부)를 반환해야 합니다. (반환값은 값만)
+        """
+        with self._lock:
+            counters = self._counters.setdefault(key, {'hits': 0, 'misses': 0, 'waits': 0})
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry[1]:
+                self._entries.move_to_end(key)
+                counters['hits'] += 1
+                return entry[0]
+            future = self._inflight.get(key)
+            waiting = future is not None
+            if waiting:
+                counters['waits'] += 1
+            else:
+                counters['misses'] += 1
+                future = self._inflight[key] = Future()
+        if waiting:
+            # 다른 세션이 조회 중인 결과를 기다림 (오래 걸리면 저장하지 않고 직접 조회)
+            try:
+                value = future.result(timeout=self.wait_timeout)
+            except FutureTimeoutError:
+                return fn(*args, **kwargs)[0]
+            if value is self._RETRY:
+                return self.get_or_fetch(key, fn, *args, **kwargs)
+            return value
+        
+        try:
+            value, ok = fn(*args, **kwargs)
+        except Exception as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        except BaseException:
+            # 세션 중단(StopException/RerunException 등)은 다른 세션에 전달하지 않음
+            with self._lock:
+                del self._inflight[key]
+            future.set_result(self._RETRY)
+            raise
+        
+        # 실패(검색 링크만 있는 대체 결과 포함)나 빈 결과는 잠깐만 보관해 곧 다시 조회
+        ttl = self.ttl if ok and value else self.empty_ttl
+        with self._lock:
+            del self._inflight[key]
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                if evicted not in self._inflight:
+                    self._counters.pop(evicted, None)
+        future.set_result(value)
+        return value
+    
+    def stats(self):
+        """
+        키별 적중/조회/대기 횟수 (조회 횟수가 많은 순)
+        """
+        with self._lock:
+            rows = [
+                {'key': key, **counters, 'cached': key in self._entries}
+                for key, counters in self._counters.items()
+            ]
+        return sorted(rows, key=lambda row: (row['hits'] + row['waits'], row['misses']), reverse=True)
+    
+    def clear(self):
+        """
+        저장된 결과 삭제 (조회 중인 요청과 횟수 기록은 유지)
+        """
+        with self._lock:
+            self._entries.clear()
+
+@st.cache_resource
+def get_enrichment_cache():
+    """
+    프로세스 전체에서 하나의 외부 정보 조회 결과 캐시를 사용
+    """
+    return EnrichmentCache()
+
+def enrichment_key_part(value):
+    # 캐시 키에 쓸 값 정규화 (NaN/빈 값은 None)
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    value = str(value).strip()
+    return value or None
+
+def get_youtube_links(person_name, job=None, main_field=None, sub_field=None):
+    """
+    search_youtube_channel 결과를 공유 캐시에서 가져오는 함수 (모든 세션 공유)
+    """
+    key = ('youtube_links',) + tuple(enrichment_key_part(value) for value in (person_name, job, main_field, sub_field))
+    return get_enrichment_cache().get_or_fetch(
+        key, fetch_youtube_links, person_name, job=job, main_field=main_field, sub_field=sub_field
+    )
+
+def get_cached_youtube_summary(youtube_url, person_name):
+    """
+    get_youtube_summary 결과를 공유 캐시에서 가져오는 함수 (URL 기준, 모든 세션 공유)
+    """
+    def fetch_summary():
+        summary = get_youtube_summary(youtube_url, person_name)
+        # Gemini 요약 실패(기본 요약으로 대체)는 일시적인 경우가 많으므로 짧게만 보관
+        return summary, summary is not None and not summary.get('warning_summary')
     
-    return results
+    return get_enrichment_cache().get_or_fetch(('youtube_summary', youtube_url), fetch_summary)
 
 def search_naver_person(person_name):
     """
@@ -533,15 +1264,8 @@ def search_naver_person(person_name):
         encoded_name = urllib.parse.quote(person_name)
         url = f"https://search.naver.com/search.naver?where=nexearch&query={encoded_name}"
         
-        # 헤더 설정 (봇 차단 방지)
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7'
-        }
-        
-        # 요청 보내기
-        response = requests.get(url, headers=headers, timeout=10)
+        # 요청 보내기 (공유 세션: 브라우저 헤더, keep-alive 연결 재사용)
+        response = get_http_session().get(url, timeout=10)
         response.raise_for_status()
         response.encoding = 'utf-8'
         
@@ -751,10 +1475,30 @@ def filter_relevant_youtube_links(links, person_name, job=None, main_field=None,
     
     return filtered
 
+def youtube_search_fallback(search_url):
+    # 채널/동영상을 찾지 못했을 때 보여줄 유튜브 검색 링크
+    return [{
+        'type': 'search',
+        'url': search_url,
+        'id': 'search',
+        'title': '유튜브에서 검색',
+        'published': None,
+        'order': 0
+    }]
+
 def search_youtube_channel(person_name, job=None, main_field=None, sub_field=None):
     """
     유튜브에서 인물의 채널/동영상을 검색하는 함수
     여러 유튜브 링크를 리스트로 반환합니다 (최신순).
+    찾지 못했거나 실패하면 유튜브 검색 링크 하나만 반환합니다.
+    """
+    return fetch_youtube_links(person_name, job=job, main_field=main_field, sub_field=sub_field)[0]
+
+def fetch_youtube_links(person_name, job=None, main_field=None, sub_field=None):
+    """
+    유튜브에서 인물의 채널/동영상을 검색하는 함수 - (링크 리스트, 성공 여부) 반환
+    검색 페이지를 가져오지 못했거나 링크를 찾지 못하면 성공 여부는 False이고,
+    링크 대신 유튜브 검색 링크(youtube_search_fallback)를 반환합니다.
     
     Args:
         person_name: 검색할 인물 이름
@@ -791,13 +1535,7 @@ def search_youtube_channel(person_name, job=None, main_field=None, sub_field=Non
         search_url = f"https://www.youtube.com/results?search_query={encoded_name}"
         
         # 웹 스크래핑 시도
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7'
-        }
-        
-        response = requests.get(search_url, headers=headers, timeout=10)
+        response = get_http_session().get(search_url, timeout=10)
         response.raise_for_status()
         response.encoding = 'utf-8'
         
@@ -948,36 +1686,22 @@ def search_youtube_channel(person_name, job=None, main_field=None, sub_field=Non
             
             # 관련성 있는 링크가 충분히 있는 경우만 반환 (최소 2개 이상)
             if len(filtered_links) >= 2:
-                return filtered_links[:15]
+                return filtered_links[:15], True
             else:
                 # 관련성 있는 링크가 너무 적으면 빈 리스트 반환
-                return []
+                return [], True
         
         # 일반 검색 (네이버, 직접 검색)의 경우 필터링 없이 반환
         if unique_links:
-            return unique_links[:15]
+            return unique_links[:15], True
         
         # 찾지 못한 경우 검색 URL을 리스트 형태로 반환
-        return [{
-            'type': 'search',
-            'url': search_url,
-            'id': 'search',
-            'title': '유튜브에서 검색',
-            'published': None,
-            'order': 0
-        }]
+        return youtube_search_fallback(search_url), False
         
     except Exception as e:
         # 실패 시 검색 URL 반환
         encoded_name = urllib.parse.quote(person_name)
-        return [{
-            'type': 'search',
-            'url': f"https://www.youtube.com/results?search_query={encoded_name}",
-            'id': 'search',
-            'title': '유튜브에서 검색',
-            'published': None,
-            'order': 0
-        }]
+        return youtube_search_fallback(f"https://www.youtube.com/results?search_query={encoded_name}"), False
 
 def extract_video_id_from_url(youtube_url):
     """
@@ -1012,12 +1736,6 @@ def get_latest_video_from_channel(channel_url):
         return None
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7'
-        }
-        
         # 채널의 /videos 페이지로 이동
         if '/videos' not in channel_url:
             if channel_url.endswith('/'):
@@ -1027,7 +1745,7 @@ def get_latest_video_from_channel(channel_url):
         else:
             videos_url = channel_url
         
-        response = requests.get(videos_url, headers=headers, timeout=20)
+        response = get_http_session().get(videos_url, timeout=20)
         response.raise_for_status()
         response.encoding = 'utf-8'
         
@@ -1095,8 +1813,8 @@ def get_youtube_transcript(video_id, lang='ko'):
     try:
         # 방법 1: youtube-transcript-api 라이브러리 사용 (v1.2.3 방식)
         try:
-            # YouTubeTranscriptApi 인스턴스 생성
-            ytt_api = YouTubeTranscriptApi()
+            # YouTubeTranscriptApi 인스턴스 생성 (라이브러리가 헤더/쿠키를 바꾸므로 별도 세션, 연결 풀은 공유)
+            ytt_api = YouTubeTranscriptApi(http_client=create_http_session())
             
             # 한국어 자막 시도
             fetched_transcript = ytt_api.fetch(video_id, languages=['ko', 'ko-KR'])
@@ -1108,7 +1826,6 @@ def get_youtube_transcript(video_id, lang='ko'):
         except (TranscriptsDisabled, NoTranscriptFound):
             # 한국어 자막이 없으면 영어 시도
             try:
-                ytt_api = YouTubeTranscriptApi()
                 fetched_transcript = ytt_api.fetch(video_id, languages=['en', 'en-US'])
                 if fetched_transcript:
                     transcript_text = ' '.join([snippet.text for snippet in fetched_transcript])
@@ -1120,14 +1837,8 @@ def get_youtube_transcript(video_id, lang='ko'):
             pass
         
         # 방법 2: 직접 자막 API 호출 (백업)
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/xml,application/xml,*/*',
-            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7'
-        }
-        
         captions_url = f"https://www.youtube.com/api/timedtext?v={video_id}&lang={lang}"
-        response = requests.get(captions_url, headers=headers, timeout=15)
+        response = get_http_session().get(captions_url, headers={'Accept': 'text/xml,application/xml,*/*'}, timeout=15)
         
         if response.status_code == 200 and response.content:
             try:
@@ -1156,9 +1867,12 @@ def get_youtube_transcript(video_id, lang='ko'):
 def summarize_transcript_with_gemini(transcript, max_length=1000):
     """
     Gemini AI를 사용하여 자막/스크립트를 요약하는 함수 (1000자 내외, 목차별 정리)
+    
+    별도 스레드에서도 호출되므로 화면에 직접 표시하지 않고 (요약, 경고 메시지)를 반환합니다.
+    Gemini를 쓸 수 없으면 기본 요약 방법의 결과와 그 이유를 반환합니다.
     """
     if not transcript:
-        return None
+        return None, None
     
     # Gemini API 키 가져오기
     gemini_api_key = os.getenv('GEMINI_API_KEY')
@@ -1170,7 +1884,7 @@ def summarize_transcript_with_gemini(transcript, max_length=1000):
     
     if not gemini_api_key:
         # API 키가 없으면 기본 요약 방법 사용
-        return summarize_transcript_fallback(transcript, max_length)
+        return summarize_transcript_fallback(transcript, max_length), None
     
     try:
         # Gemini API 초기화
@@ -1200,9 +1914,8 @@ def summarize_transcript_with_gemini(transcript, max_length=1000):
         
         if model is None:
             # 모든 모델이 실패한 경우
-            if last_error:
-                st.warning(f"⚠️ Gemini 모델 로딩 실패: {str(last_error)}")
-            return summarize_transcript_fallback(transcript, max_length)
+            warning = f"Gemini 모델 로딩 실패: {str(last_error)}" if last_error else None
+            return summarize_transcript_fallback(transcript, max_length), warning
         
         # 프롬프트 생성 (목차별 정리)
         target_length = max_length
@@ -1274,14 +1987,13 @@ def summarize_transcript_with_gemini(transcript, max_length=1000):
                 # 너무 짧으면 원본 스크립트에서 더 추가 (Gemini가 충분히 요약하지 않은 경우)
                 pass  # 그대로 사용 (Gemini 요약 결과)
             
-            return summary
+            return summary, None
         else:
-            return summarize_transcript_fallback(transcript, max_length)
+            return summarize_transcript_fallback(transcript, max_length), None
             
     except Exception as e:
         # 에러 발생 시 기본 방법 사용
-        st.warning(f"⚠️ Gemini API 요약 실패, 기본 요약 방법 사용: {str(e)}")
-        return summarize_transcript_fallback(transcript, max_length)
+        return summarize_transcript_fallback(transcript, max_length), f"Gemini API 요약 실패, 기본 요약 방법 사용: {str(e)}"
 
 def summarize_transcript_fallback(transcript, max_length=1000):
     """
@@ -1389,25 +2101,39 @@ def summarize_transcript_fallback(transcript, max_length=1000):
 def summarize_transcript(transcript, max_length=1000):
     """
     자막/스크립트를 요약하는 함수 (Gemini 우선 사용, 1000자 내외, 목차별 정리)
+    (요약, 경고 메시지)를 반환합니다.
     """
     return summarize_transcript_with_gemini(transcript, max_length)
 
 def get_youtube_summary(youtube_url, person_name):
     """
     유튜브 채널/동영상 정보를 가져와서 요약하는 함수
+    
+    페이지 정보(채널명, 구독자 수 등)와 스크립트(채널이면 최신 동영상 → 자막 → 요약)는 서로
+    독립적이므로 스크립트 쪽을 먼저 별도 스레드에서 시작한 뒤 페이지를 가져옵니다.
     """
     if not youtube_url or 'youtube.com/results' in youtube_url:
         # 검색 URL인 경우 요약 정보 없음
         return None
     
+    cancelled = threading.Event()
+    transcript_future = start_enrichment(get_youtube_transcript_summary, youtube_url, cancelled=cancelled)
+    summary = get_youtube_page_summary(youtube_url)
+    if summary is None:
+        # 페이지를 가져오지 못하면 요약 정보 없음
+        # (이미 시작된 자막 조회는 멈출 수 없으므로 다음 단계, 특히 Gemini 요약 전에 중단하도록 알림)
+        cancelled.set()
+        return None
+    
+    summary.update(transcript_future.result())
+    return summary
+
+def get_youtube_page_summary(youtube_url):
+    """
+    유튜브 채널/동영상 페이지에서 채널명, 설명, 구독자 수, 동영상 수, 최근 동영상 제목을 가져오는 함수
+    """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7'
-        }
-        
-        response = requests.get(youtube_url, headers=headers, timeout=10)
+        response = get_http_session().get(youtube_url, timeout=10)
         response.raise_for_status()
         response.encoding = 'utf-8'
         
@@ -1516,45 +2242,66 @@ def get_youtube_summary(youtube_url, person_name):
         
         summary['recent_videos'] = video_titles[:3]
         
-        # 비디오 URL인 경우 자막/스크립트 가져오기
-        video_id = extract_video_id_from_url(youtube_url)
-        
-        # 비디오 ID가 없으면 채널 URL로 간주하고 최신 동영상 찾기
-        if not video_id:
-            # 채널 URL인지 확인
-            is_channel = any(x in youtube_url for x in ['/channel/', '/c/', '/@', '/user/'])
-            if is_channel:
-                # 채널에서 최신 동영상 찾기
-                video_id = get_latest_video_from_channel(youtube_url)
-        
-        # 원본 스크립트와 요약 저장
-        summary['transcript_raw'] = None
-        summary['transcript_summary'] = None
-        summary['video_id_used'] = video_id  # 디버깅용
-        
-        if video_id:
-            # 스크립트 가져오기 시도
-            try:
-                transcript = get_youtube_transcript(video_id)
-                if transcript and len(transcript.strip()) > 50:  # 의미있는 스크립트인지 확인
-                    # 원본 스크립트 저장 (요약 없이 그대로)
-                    summary['transcript_raw'] = transcript
-                    # 요약도 생성 (1000자 내외, 목차별 정리)
-                    try:
-                        summary['transcript_summary'] = summarize_transcript(transcript, max_length=1000)
-                    except Exception as sum_err:
-                        summary['transcript_summary'] = None
-                        summary['error_summary'] = f"요약 실패: {str(sum_err)}"
-                else:
-                    summary['error_transcript'] = "스크립트가 너무 짧거나 없습니다"
-            except Exception as trans_err:
-                summary['error_transcript'] = f"스크립트 가져오기 실패: {str(trans_err)}"
-        
         return summary
         
     except Exception as e:
         return None
 
+def get_youtube_transcript_summary(youtube_url, cancelled=None):
+    """
+    유튜브 동영상(채널이면 최신 동영상)의 자막을 가져와 요약하는 함수
+    별도 스레드에서 실행되므로 화면에 직접 표시하지 않습니다. (경고는 'warning_summary'로 반환)
+    
+    Args:
+        cancelled: threading.Event - 설정되면 자막 조회/요약 단계를 더 진행하지 않음
+    
+    Returns:
+        {'transcript_raw', 'transcript_summary', 'video_id_used'}
+        (실패 시 'error_transcript'/'error_summary', Gemini 대신 기본 요약을 쓴 경우 'warning_summary' 포함)
+    """
+    # 비디오 URL인 경우 자막/스크립트 가져오기
+    video_id = extract_video_id_from_url(youtube_url)
+    
+    # 비디오 ID가 없으면 채널 URL로 간주하고 최신 동영상 찾기
+    if not video_id:
+        # 채널 URL인지 확인
+        is_channel = any(x in youtube_url for x in ['/channel/', '/c/', '/@', '/user/'])
+        if is_channel:
+            # 채널에서 최신 동영상 찾기
+            video_id = get_latest_video_from_channel(youtube_url)
+    
+    # 원본 스크립트와 요약 저장
+    summary = {
+        'transcript_raw': None,
+        'transcript_summary': None,
+        'video_id_used': video_id,  # 디버깅용
+    }
+    
+    if video_id and not (cancelled is not None and cancelled.is_set()):
+        # 스크립트 가져오기 시도
+        try:
+            transcript = get_youtube_transcript(video_id)
+            if cancelled is not None and cancelled.is_set():
+                # 결과를 쓰지 않으므로 요약(Gemini 호출)은 생략
+                return summary
+            if transcript and len(transcript.strip()) > 50:  # 의미있는 스크립트인지 확인
+                # 원본 스크립트 저장 (요약 없이 그대로)
+                summary['transcript_raw'] = transcript
+                # 요약도 생성 (1000자 내외, 목차별 정리)
+                try:
+                    summary['transcript_summary'], warning = summarize_transcript(transcript, max_length=1000)
+                    if warning:
+                        summary['warning_summary'] = warning
+                except Exception as sum_err:
+                    summary['transcript_summary'] = None
+                    summary['error_summary'] = f"요약 실패: {str(sum_err)}"
+            else:
+                summary['error_transcript'] = "스크립트가 너무 짧거나 없습니다"
+        except Exception as trans_err:
+            summary['error_transcript'] = f"스크립트 가져오기 실패: {str(trans_err)}"
+    
+    return summary
+
 def display_youtube_list_and_summary(youtube_links, person_name, instructor_name):
     """
     유튜브 링크 리스트를 표시하고 선택된 링크의 요약 정보를 표시하는 함수
@@ -1700,14 +2447,9 @@ def display_youtube_summary(youtube_url, person_name):
     if not youtube_url:
         return
     
-    # 요약 정보 가져오기
-    summary_cache_key = f"youtube_summary_{youtube_url}"
-    if summary_cache_key not in st.session_state:
-        with st.spinner("유튜브 채널 정보 및 스크립트를 불러오는 중..."):
-            summary = get_youtube_summary(youtube_url, person_name)
-            st.session_state[summary_cache_key] = summary
-    else:
-        summary = st.session_state[summary_cache_key]
+    # 요약 정보 가져오기 (모든 세션이 공유하는 캐시, 다른 세션이 조회 중이면 그 결과를 기다림)
+    with st.spinner("유튜브 채널 정보 및 스크립트를 불러오는 중..."):
+        summary = get_cached_youtube_summary(youtube_url, person_name)
     
     if not summary:
         st.warning("⚠️ 유튜브 정보를 불러올 수 없습니다.")
@@ -1736,6 +2478,8 @@ def display_youtube_summary(youtube_url, person_name):
         # 스크립트 요약이 있으면 표시
         st.markdown('<hr style="margin: 1rem 0; border: none; border-top: 1px solid #e8e8e8; opacity: 0.5;">', unsafe_allow_html=True)
         st.markdown("### 📋 스크립트 요약 (1000자 목차별)")
+        if summary.get('warning_summary'):
+            st.warning(f"⚠️ {summary['warning_summary']}")
         st.markdown(summary['transcript_summary'])
         
         # 비디오 ID 표시 (디버깅용)
@@ -1787,18 +2531,12 @@ def display_youtube_summary(youtube_url, person_name):
     st.markdown('</div>', unsafe_allow_html=True)
 
 # Session state 초기화
-if 'selected_instructor' not in st.session_state:
-    st.session_state.selected_instructor = None
 if 'selected_instructor_idx' not in st.session_state:
     st.session_state.selected_instructor_idx = None
-if 'search_results' not in st.session_state:
-    st.session_state.search_results = pd.DataFrame()
+if 'search_result' not in st.session_state:
+    st.session_state.search_result = None
 if 'web_search_result' not in st.session_state:
     st.session_state.web_search_result = None
-if 'last_search_query' not in st.session_state:
-    st.session_state.last_search_query = None
-if 'last_search_type' not in st.session_state:
-    st.session_state.last_search_type = None
 
 # 메인 UI
 st.markdown('''
@@ -1825,14 +2563,15 @@ uploaded_file = st.file_uploader("CSV 파일 업로드 (선택사항)", type=['c
 with st.spinner("강사 데이터를 불러오는 중..."):
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
-            df.columns = df.columns.str.strip()
-            st.success(f"CSV 파일을 성공적으로 읽었습니다. ({len(df)}개 행)")
+            uploaded_df = prepare_instructor_frame(pd.read_csv(uploaded_file))
+            dataset = get_uploaded_dataset(uploaded_df, uploaded_df.attrs['data_version'])
+            st.success(f"CSV 파일을 성공적으로 읽었습니다. ({len(uploaded_df)}개 행)")
         except Exception as e:
             st.error(f"CSV 파일 읽기 실패: {str(e)}")
-            df = pd.DataFrame()
+            dataset = InstructorDataset.build(pd.DataFrame())
     else:
-        df = load_instructor_data()
+        dataset = load_instructor_dataset()
+    df = dataset.frame
 
 if df.empty:
     st.error("강사 데이터를 불러올 수 없습니다. 구글 시트 연결을 확인해주세요.")
@@ -1867,6 +2606,11 @@ if df.empty:
     
     st.stop()
 
+# 컬럼 스키마, 검색 역색인, 통계 (데이터가 바뀔 때 변경분만 반영되어 함께 교체됨)
+data_version = dataset.version
+schema = dataset.schema
+instructor_stats = dataset.stats
+
 # 관리자용 강사 정보 업로드 섹션
 st.markdown('<hr style="margin: 2rem 0; border: none; border-top: 1px solid #e8e8e8; opacity: 0.5;">', unsafe_allow_html=True)
 st.markdown("### 🛠️ 관리자 기능")
@@ -1947,6 +2691,76 @@ with st.expander("📤 강사 정보 업로드", expanded=False):
             except Exception as e:
                 st.error(f"파일 읽기 실패: {str(e)}")
 
+with st.expander("📋 명단 일괄 조회", expanded=False):
+    st.markdown("**후보 명단을 시트와 한 번에 대조하여 이미 등록된 강사를 찾습니다.**")
+    
+    roster_file = st.file_uploader(
+        "명단 파일 (엑셀/CSV)",
+        type=['xlsx', 'xls', 'csv'],
+        key="roster_file",
+        help="이름 컬럼(필수)과 이메일 컬럼(선택)이 있는 파일을 업로드하세요."
+    )
+    roster_text = st.text_area(
+        "또는 명단 붙여넣기 (한 줄에 한 명, 이메일은 쉼표 뒤에 입력)",
+        placeholder="김양민\n윤정구, yoon@example.com",
+        height=120,
+        key="roster_text"
+    )
+    
+    roster_names, roster_emails = [], None
+    if roster_file is not None:
+        try:
+            roster_df = read_roster_file(roster_file, roster_file.name)
+            guessed_name, guessed_email = guess_roster_columns(roster_df.columns)
+            columns = [str(col) for col in roster_df.columns]
+            col1, col2 = st.columns(2)
+            with col1:
+                name_column = st.selectbox("이름 컬럼", options=columns, index=columns.index(guessed_name),
+                                           key="roster_name_column")
+            with col2:
+                email_options = ['(없음)'] + columns
+                email_column = st.selectbox(
+                    "이메일 컬럼", options=email_options,
+                    index=email_options.index(guessed_email) if guessed_email else 0,
+                    key="roster_email_column"
+                )
+            roster_names = roster_df[name_column].tolist()
+            if email_column != '(없음)':
+                roster_emails = roster_df[email_column].tolist()
+        except Exception as e:
+            st.error(f"명단 파일 읽기 실패: {str(e)}")
+    elif roster_text.strip():
+        roster_names, roster_emails = parse_roster_text(roster_text)
+    
+    if roster_names:
+        report = get_roster_report(
+            dataset, data_version, tuple(roster_names), None if roster_emails is None else tuple(roster_emails)
+        )
+        # 명단 항목별 결과 (후보가 여러 명인 항목도 한 번만 집계)
+        entries = report.drop_duplicates('순번')
+        status_counts = entries['결과'].value_counts()
+        
+        metric_cols = st.columns(len(ROSTER_STATUS_LABELS))
+        for metric_col, label in zip(metric_cols, ROSTER_STATUS_LABELS.values()):
+            with metric_col:
+                st.metric(label, f"{int(status_counts.get(label, 0))}명")
+        
+        tabs = st.tabs([f"{label} ({int(status_counts.get(label, 0))})" for label in ROSTER_STATUS_LABELS.values()])
+        for tab, label in zip(tabs, ROSTER_STATUS_LABELS.values()):
+            with tab:
+                rows = report[report['결과'] == label]
+                if label == ROSTER_STATUS_LABELS['unknown']:
+                    rows = rows[['순번', '입력 이름', '입력 이메일']]
+                st.dataframe(rows, use_container_width=True, hide_index=True)
+        
+        st.download_button(
+            "📥 조회 결과 다운로드 (CSV)",
+            data=report.to_csv(index=False).encode('utf-8-sig'),  # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+            file_name="roster_lookup.csv",
+            mime="text/csv",
+            use_container_width=True,
+        )
+
 st.markdown('<hr style="margin: 2rem 0; border: none; border-top: 1px solid #e8e8e8; opacity: 0.5;">', unsafe_allow_html=True)
 
 # 검색 입력 섹션
@@ -1955,22 +2769,28 @@ col1, col2 = st.columns([4, 1])
 with col1:
     search_query = st.text_input(
         "검색어를 입력하세요",
-        placeholder="예: 김양민, 마케팅, 전략, Management 등",
+        placeholder="예: 김양민, ㄱㅇㅁ, 마케팅, 전략, Management 등",
         key="search_input"
     )
 
 with col2:
     search_type = st.selectbox(
         "검색 범위",
-        options=['all', 'name', 'field', 'subject'],
+        options=['all', 'name', 'field', 'subject', 'feedback'],
         format_func=lambda x: {
             'all': '전체',
             'name': '강사이름',
             'field': '분야',
-            'subject': '강의과목'
+            'subject': '강의과목',
+            'feedback': '의견'
         }[x],
         key="search_type"
     )
+    rank_results = st.checkbox(
+        f"관련도순 (상위 {RANK_TOP_K}명)",
+        key="rank_results",
+        help="강의 과목, 분야, 학습자 의견에서 검색어와 관련도가 높은 강사부터 보여줍니다. (강사이름 검색에는 적용되지 않음)"
+    )
 
 # 검색 버튼
 search_button = st.button("🔍 검색", type="primary", use_container_width=True)
@@ -1978,42 +2798,78 @@ search_button = st.button("🔍 검색", type="primary", use_container_width=Tru
 # 검색 실행 및 결과 표시
 if search_button and search_query:
     with st.spinner("검색 중..."):
-        results = search_instructors(df, search_query, search_type)
-        st.session_state.search_results = results
-        st.session_state.web_search_result = None  # 초기화
-        
-        # 검색어와 타입을 세션 상태에 저장 (rerun 후에도 유지)
-        st.session_state.last_search_query = search_query
-        st.session_state.last_search_type = search_type
-        
-        # 검색 결과가 없고, 검색 타입이 이름 검색인 경우 네이버 인물검색 시도
-        if results.empty and (search_type == 'name' or search_type == 'all'):
-            with st.spinner("웹에서 정보를 검색하는 중..."):
-                web_result = search_naver_person(search_query)
-                if web_result:
-                    st.session_state.web_search_result = web_result
+        previous_result = st.session_state.search_result
+        search_result = get_search_result(dataset, search_query, search_type, ranked=rank_results)
+        
+        # 같은 검색어/범위/데이터 버전이면 이전 결과(웹 검색 결과 포함)를 그대로 사용
+        if search_result is not previous_result:
+            st.session_state.web_search_result = None  # 초기화
+            # 결과 좁히기 선택 초기화
+            for facet in FACET_LABELS:
+                st.session_state.pop(f"facet_{facet}", None)
+            
+            # 검색 결과가 없고, 검색 타입이 이름 검색인 경우 네이버 인물검색 시도 (조건 검색 제외)
+            if search_result.empty and not search_result.structured and (search_type == 'name' or search_type == 'all'):
+                with st.spinner("웹에서 정보를 검색하는 중..."):
+                    # 아래 결과 화면에서 쓸 유튜브 검색을 네이버 인물검색과 동시에 실행 (결과는 공유 캐시에 저장)
+                    youtube_future = start_enrichment(get_youtube_links, search_query)
+                    web_result = search_naver_person(search_query)
+                    youtube_future.result()
+                    if web_result:
+                        st.session_state.web_search_result = web_result
     # 새 검색 시 상세 정보 초기화
-    st.session_state.selected_instructor = None
     st.session_state.selected_instructor_idx = None
+elif st.session_state.search_result is not None and st.session_state.search_result.data_version != data_version:
+    # 데이터가 갱신되면 같은 검색어로 결과를 다시 계산
+    previous_result = st.session_state.search_result
+    get_search_result(dataset, previous_result.query, previous_result.search_type, ranked=previous_result.ranked)
+
+search_result = st.session_state.search_result
 
 # 검색 결과가 있으면 표시
-if not st.session_state.search_results.empty:
-    results = st.session_state.search_results
-    
-    if not results.empty:
-        st.markdown(f"### 📋 검색 결과 ({len(results)}명)")
+if search_result is not None and not search_result.empty:
+    # 결과 좁히기: 패싯 값별 개수는 전체 결과(관련도순이면 상위 k명으로 자르기 전) 기준으로 세고,
+    # 필터는 검색에 함께 넘겨 관련도순 상위 강사를 필터 적용 후에 뽑음
+    hit_mask = search_result.hit_mask(df)
+    facet_selections = {facet: st.session_state.get(f"facet_{facet}", []) for facet in FACET_LABELS}
+    facet_counts = dataset.facets.counts(hit_mask, facet_selections)
+    filtered_result = get_filtered_result(dataset, search_result, facet_selections)
+    results = filtered_result.rows(df)
+    
+    if not results.empty or any(facet_selections.values()):
+        filtered = any(facet_selections.values())
+        filter_text = f" / 필터 전 {int(np.count_nonzero(hit_mask))}명" if filtered else ""
+        if search_result.ranked and filtered:
+            # 관련도순은 상위 강사만 보여주므로 필터에 맞는 전체 강사 수를 함께 표시
+            filtered_count = int(np.count_nonzero(hit_mask & dataset.facets.mask(facet_selections, len(df))))
+            filter_text = f" / 필터 결과 {filtered_count}명{filter_text}"
+        if search_result.ranked:
+            st.markdown(f"### 📋 검색 결과 (관련도 상위 {len(results)}명 / 전체 {search_result.matched_count}건{filter_text})")
+        else:
+            st.markdown(f"### 📋 검색 결과 ({len(results)}명{filter_text})")
+        if search_result.corrected_terms:
+            corrected_text = ", ".join(f"'{term}'" for term in search_result.corrected_terms)
+            st.info(f"🔤 '{search_result.query}'에 대한 검색 결과가 없어 비슷한 검색어 {corrected_text}의 결과를 표시합니다.")
+        
+        # 결과 좁히기 (값 옆 숫자는 다른 조건을 적용했을 때의 결과 수)
+        if facet_counts:
+            with st.expander("🔎 결과 좁히기", expanded=filtered):
+                facet_columns = st.columns(len(facet_counts))
+                for facet_column, (facet, value_counts) in zip(facet_columns, facet_counts.items()):
+                    with facet_column:
+                        st.multiselect(
+                            FACET_LABELS[facet],
+                            options=list(value_counts),
+                            format_func=lambda value, value_counts=value_counts: f"{value} ({value_counts.get(value, 0)})",
+                            key=f"facet_{facet}",
+                        )
         
         # 검색 결과 리스트
         for idx, instructor in results.iterrows():
             with st.container():
-                # 컬럼명 찾기
-                name_col = [col for col in instructor.index if '강사' in col and '이름' in col]
-                affiliation_col = [col for col in instructor.index if '소속' in col]
-                job_col = [col for col in instructor.index if '직업' in col]
-                
-                name = instructor[name_col[0]] if name_col and pd.notna(instructor[name_col[0]]) else "이름 없음"
-                affiliation = instructor[affiliation_col[0]] if affiliation_col and pd.notna(instructor[affiliation_col[0]]) else "소속 정보 없음"
-                job = instructor[job_col[0]] if job_col and pd.notna(instructor[job_col[0]]) else "직업 정보 없음"
+                name = schema.value(instructor, 'name') or "이름 없음"
+                affiliation = schema.value(instructor, 'affiliation') or "소속 정보 없음"
+                job = schema.value(instructor, 'job') or "직업 정보 없음"
                 
                 # 카드 표시
                 st.markdown('<div class="instructor-card">', unsafe_allow_html=True)
@@ -2031,38 +2887,36 @@ if not st.session_state.search_results.empty:
                 if st.button(button_text, key=f"detail_{idx}", use_container_width=True):
                     if st.session_state.selected_instructor_idx == idx:
                         # 이미 선택된 항목이면 닫기
-                        st.session_state.selected_instructor = None
                         st.session_state.selected_instructor_idx = None
                     else:
-                        # 새로운 항목 선택
-                        st.session_state.selected_instructor = instructor.to_dict()
+                        # 새로운 항목 선택 (세션에는 행 ID만 저장)
                         st.session_state.selected_instructor_idx = idx
                     st.rerun()
                 
                 st.markdown('</div>', unsafe_allow_html=True)
                 
                 # 선택된 항목이면 바로 아래에 상세 정보 표시
-                if st.session_state.selected_instructor_idx == idx and st.session_state.selected_instructor is not None:
+                if st.session_state.selected_instructor_idx == idx:
                     
                     st.markdown('<div class="profile-container">', unsafe_allow_html=True)
                     
-                    # 컬럼명 찾기
-                    name_cols = [key for key in st.session_state.selected_instructor.keys() if '강사' in key and '이름' in key]
-                    job_cols = [key for key in st.session_state.selected_instructor.keys() if '직업' in key]
-                    affiliation_cols = [key for key in st.session_state.selected_instructor.keys() if '소속' in key]
-                    subject_cols = [key for key in st.session_state.selected_instructor.keys() if '강의' in key and '과목' in key]
-                    email_cols = [key for key in st.session_state.selected_instructor.keys() if 'e-mail' in key or '이메일' in key]
-                    main_cat_cols = [key for key in st.session_state.selected_instructor.keys() if '대분야' in key]
-                    sub_cat_cols = [key for key in st.session_state.selected_instructor.keys() if '소분야' in key]
-                    satisfaction_cols = [key for key in st.session_state.selected_instructor.keys() if '만족도' in key]
-                    feedback_cols = [key for key in st.session_state.selected_instructor.keys() if '학습자' in key or '의견' in key]
-                    manager_cols = [key for key in st.session_state.selected_instructor.keys() if '담당자' in key]
+                    instructor_record = instructor
+                    instructor_name = schema.value(instructor_record, 'name')
+                    instructor_job = schema.value(instructor_record, 'job')
+                    instructor_main_field = schema.value(instructor_record, 'main_field')
+                    instructor_sub_field = schema.value(instructor_record, 'sub_field')
+                    instructor_affiliation = schema.value(instructor_record, 'affiliation')
+                    instructor_subject = schema.value(instructor_record, 'subject')
+                    instructor_email = schema.value(instructor_record, 'email')
+                    satisfaction_value = schema.value(instructor_record, 'satisfaction')
+                    feedback_text = schema.value(instructor_record, 'feedback')
+                    manager_text = schema.value(instructor_record, 'manager_comment')
                     
                     # === 헤더: 강사 이름과 직업 ===
                     st.markdown('<div class="profile-header">', unsafe_allow_html=True)
                     
-                    instructor_name_display = st.session_state.selected_instructor[name_cols[0]] if name_cols else "이름 없음"
-                    instructor_job_display = st.session_state.selected_instructor[job_cols[0]] if job_cols and pd.notna(st.session_state.selected_instructor.get(job_cols[0])) else ""
+                    instructor_name_display = instructor_record.get(schema.name) if schema.name else "이름 없음"
+                    instructor_job_display = instructor_job or ""
                     
                     st.markdown(f'<h2 class="profile-name">{instructor_name_display}</h2>', unsafe_allow_html=True)
                     if instructor_job_display:
@@ -2075,10 +2929,10 @@ if not st.session_state.search_results.empty:
                     st.markdown('#### 강연분야')
                     
                     fields_display = []
-                    if main_cat_cols and pd.notna(st.session_state.selected_instructor.get(main_cat_cols[0])):
-                        fields_display.append(f"**{st.session_state.selected_instructor[main_cat_cols[0]]}**")
-                    if sub_cat_cols and pd.notna(st.session_state.selected_instructor.get(sub_cat_cols[0])):
-                        fields_display.append(f"_{st.session_state.selected_instructor[sub_cat_cols[0]]}_")
+                    if instructor_main_field is not None:
+                        fields_display.append(f"**{instructor_main_field}**")
+                    if instructor_sub_field is not None:
+                        fields_display.append(f"_{instructor_sub_field}_")
                     
                     if fields_display:
                         st.markdown("( " + ", ".join(fields_display) + " )")
@@ -2088,97 +2942,67 @@ if not st.session_state.search_results.empty:
                     st.markdown('</div>', unsafe_allow_html=True)
                     
                     # === 주요 정보 섹션 (소속, 이메일 등) ===
-                    if affiliation_cols and pd.notna(st.session_state.selected_instructor.get(affiliation_cols[0])):
+                    if instructor_affiliation is not None:
                         st.markdown('<div class="profile-section">', unsafe_allow_html=True)
                         st.markdown('#### 소속')
-                        st.markdown(f"- {st.session_state.selected_instructor[affiliation_cols[0]]}")
+                        st.markdown(f"- {instructor_affiliation}")
                         st.markdown('</div>', unsafe_allow_html=True)
                     
                     # === 강의 과목 섹션 ===
-                    if subject_cols and pd.notna(st.session_state.selected_instructor.get(subject_cols[0])):
+                    if instructor_subject is not None:
                         st.markdown('<div class="profile-section">', unsafe_allow_html=True)
                         st.markdown('#### 강의 과목')
-                        subjects = str(st.session_state.selected_instructor[subject_cols[0]]).split(',')
+                        subjects = str(instructor_subject).split(',')
                         for subj in subjects:
                             st.markdown(f"- {subj.strip()}")
                         st.markdown('</div>', unsafe_allow_html=True)
                     
                     # === 연락처 섹션 ===
-                    if email_cols and pd.notna(st.session_state.selected_instructor.get(email_cols[0])):
+                    if instructor_email is not None:
                         st.markdown('<div class="profile-section">', unsafe_allow_html=True)
                         st.markdown('#### 연락처')
-                        st.markdown(f"**📧 이메일:** {st.session_state.selected_instructor[email_cols[0]]}")
+                        st.markdown(f"**📧 이메일:** {instructor_email}")
                         st.markdown('</div>', unsafe_allow_html=True)
                     
                     # === 강의평가 섹션 ===
-                    if satisfaction_cols and pd.notna(st.session_state.selected_instructor.get(satisfaction_cols[0])):
+                    if satisfaction_value is not None:
                         st.markdown('<div class="profile-section evaluation-section">', unsafe_allow_html=True)
                         st.markdown('#### 강의평가')
-                        satisfaction_value = st.session_state.selected_instructor[satisfaction_cols[0]]
-                        st.markdown(f'<div class="rating-display">평점 <span class="rating-score">{satisfaction_value}</span> ⭐</div>', unsafe_allow_html=True)
+                        # 로드 시 변환해 둔 5점 만점 점수를 표시 (원문 형식이 다르면 함께 표시)
+                        satisfaction_score = dataset.satisfaction.scores[df.index.get_loc(idx)]
+                        if np.isnan(satisfaction_score):
+                            rating_text = f'{satisfaction_value}'
+                        else:
+                            rating_text = f'{satisfaction_score:.1f} / 5'
+                            if str(satisfaction_value).strip() != f'{satisfaction_score:.1f}':
+                                rating_text += f' <span style="font-size: 0.8em; opacity: 0.6;">(원문: {satisfaction_value})</span>'
+                        st.markdown(f'<div class="rating-display">평점 <span class="rating-score">{rating_text}</span> ⭐</div>', unsafe_allow_html=True)
                         st.markdown('</div>', unsafe_allow_html=True)
                     
                     # === 학습자 의견 섹션 ===
-                    if feedback_cols and pd.notna(st.session_state.selected_instructor.get(feedback_cols[0])):
+                    if feedback_text is not None:
                         st.markdown('<div class="profile-section review-section">', unsafe_allow_html=True)
                         st.markdown('#### 💬 학습자 주요 의견')
-                        feedback_text = st.session_state.selected_instructor[feedback_cols[0]]
                         st.markdown(f'<div class="review-content">{feedback_text}</div>', unsafe_allow_html=True)
                         st.markdown('</div>', unsafe_allow_html=True)
                     
                     # === 담당자 의견 섹션 ===
-                    if manager_cols and pd.notna(st.session_state.selected_instructor.get(manager_cols[0])):
+                    if manager_text is not None:
                         st.markdown('<div class="profile-section">', unsafe_allow_html=True)
                         st.markdown('#### 📝 담당자 의견')
-                        manager_text = st.session_state.selected_instructor[manager_cols[0]]
                         st.markdown(f'<div class="manager-content">{manager_text}</div>', unsafe_allow_html=True)
                         st.markdown('</div>', unsafe_allow_html=True)
                     
-                    # 유튜브 링크 검색 및 표시
-                    instructor_name = None
-                    instructor_job = None
-                    instructor_main_field = None
-                    instructor_sub_field = None
-                    
-                    if name_cols:
-                        instructor_name = st.session_state.selected_instructor[name_cols[0]]
-                    
-                    # 직업 정보 추출
-                    if job_cols and pd.notna(st.session_state.selected_instructor.get(job_cols[0])):
-                        instructor_job = st.session_state.selected_instructor[job_cols[0]]
-                    
-                    # 대분야 정보 추출
-                    if main_cat_cols and pd.notna(st.session_state.selected_instructor.get(main_cat_cols[0])):
-                        instructor_main_field = st.session_state.selected_instructor[main_cat_cols[0]]
-                    
-                    # 소분야 정보 추출
-                    if sub_cat_cols and pd.notna(st.session_state.selected_instructor.get(sub_cat_cols[0])):
-                        instructor_sub_field = st.session_state.selected_instructor[sub_cat_cols[0]]
-                    
                     # === 유튜브 섹션 ===
                     if instructor_name and pd.notna(instructor_name):
-                        # 유튜브 링크 리스트를 세션 상태에 캐시 (추가 정보 포함하여 고유 키 생성)
-                        cache_key_parts = [instructor_name]
-                        if instructor_job:
-                            cache_key_parts.append(str(instructor_job))
-                        if instructor_sub_field:
-                            cache_key_parts.append(str(instructor_sub_field))
-                        elif instructor_main_field:
-                            cache_key_parts.append(str(instructor_main_field))
-                        
-                        youtube_cache_key = f"youtube_links_{'_'.join(cache_key_parts)}"
-                        
-                        if youtube_cache_key not in st.session_state:
-                            with st.spinner("유튜브 채널/동영상 검색 중..."):
-                                youtube_links = search_youtube_channel(
-                                    instructor_name, 
-                                    job=instructor_job,
-                                    main_field=instructor_main_field,
-                                    sub_field=instructor_sub_field
-                                )
-                                st.session_state[youtube_cache_key] = youtube_links
-                        else:
-                            youtube_links = st.session_state[youtube_cache_key]
+                        # 유튜브 링크 리스트는 모든 세션이 공유하는 캐시에서 가져옴 (이름, 직업, 분야별)
+                        with st.spinner("유튜브 채널/동영상 검색 중..."):
+                            youtube_links = get_youtube_links(
+                                instructor_name, 
+                                job=instructor_job,
+                                main_field=instructor_main_field,
+                                sub_field=instructor_sub_field
+                            )
                         
                         if youtube_links:
                             st.markdown('<div class="profile-section">', unsafe_allow_html=True)
@@ -2195,7 +3019,7 @@ if not st.session_state.search_results.empty:
 # 웹 검색 결과가 있으면 표시 (rerun 후에도 유지)
 if st.session_state.web_search_result:
     # 검색어 가져오기
-    search_query_for_display = st.session_state.get('last_search_query', search_query)
+    search_query_for_display = search_result.query if search_result is not None else search_query
     
     st.warning(f"'{search_query_for_display}'에 대한 검색 결과가 없습니다.")
     
@@ -2243,14 +3067,9 @@ if st.session_state.web_search_result:
             person_name = web_result.get('name', search_query)
             if person_name:
                 st.markdown('<hr style="margin: 1rem 0; border: none; border-top: 1px solid #e8e8e8; opacity: 0.5;">', unsafe_allow_html=True)
-                # 유튜브 링크 리스트를 세션 상태에 캐시
-                youtube_cache_key = f"youtube_links_naver_{person_name}"
-                if youtube_cache_key not in st.session_state:
-                    with st.spinner("유튜브 채널/동영상 검색 중..."):
-                        youtube_links = search_youtube_channel(person_name)
-                        st.session_state[youtube_cache_key] = youtube_links
-                else:
-                    youtube_links = st.session_state[youtube_cache_key]
+                # 유튜브 링크 리스트는 모든 세션이 공유하는 캐시에서 가져옴
+                with st.spinner("유튜브 채널/동영상 검색 중..."):
+                    youtube_links = get_youtube_links(person_name)
                 
                 if youtube_links:
                     # 유튜브 리스트 및 요약 정보 표시
@@ -2264,7 +3083,16 @@ if st.session_state.web_search_result:
         st.markdown('</div>', unsafe_allow_html=True)
 
 # 검색 버튼이 눌렸지만 결과가 없고 웹 검색 결과도 없는 경우
-elif search_button and search_query and st.session_state.search_results.empty and not st.session_state.web_search_result:
+elif search_button and search_query and search_result is not None and search_result.empty and search_result.structured:
+    # 조건 검색은 웹/유튜브 검색 없이 결과 없음(또는 조건식 오류)만 표시
+    if search_result.error:
+        st.warning(f"검색 조건을 해석할 수 없습니다: {search_result.error}")
+    else:
+        st.warning(f"'{search_query}' 조건에 맞는 강사가 없습니다.")
+    st.info("💡 **조건 검색 예:** `subject:마케팅 AND field:전략 NOT job:학생`, `과목:\"디지털 마케팅\" OR 분야:리더십` "
+            "(필드: name/이름, field/분야, subject/과목, job/직업, affiliation/소속, feedback/의견, "
+            "satisfaction/만족도 - 예: `만족도:>=4.5`, `만족도:4..5`)")
+elif search_button and search_query and search_result is not None and search_result.empty and not st.session_state.web_search_result:
     st.warning(f"'{search_query}'에 대한 검색 결과가 없습니다.")
     st.info("💡 **팁:** 검색어를 변경하거나 '전체' 검색 범위를 사용해보세요.")
     st.info("💡 **팁:** 강사 이름으로 검색하면 네이버 인물검색에서 정보를 찾을 수 있습니다.")
@@ -2273,14 +3101,9 @@ elif search_button and search_query and st.session_state.search_results.empty an
     st.markdown('<hr style="margin: 1.5rem 0; border: none; border-top: 1px solid #e8e8e8; opacity: 0.5;">', unsafe_allow_html=True)
     st.markdown(f"### 📺 '{search_query}' 유튜브 검색 결과")
     
-    # 유튜브 링크 리스트를 세션 상태에 캐시
-    youtube_cache_key = f"youtube_links_direct_{search_query}"
-    if youtube_cache_key not in st.session_state:
-        with st.spinner("유튜브 채널/동영상 검색 중..."):
-            youtube_links = search_youtube_channel(search_query)
-            st.session_state[youtube_cache_key] = youtube_links
-    else:
-        youtube_links = st.session_state[youtube_cache_key]
+    # 유튜브 링크 리스트는 모든 세션이 공유하는 캐시에서 가져옴
+    with st.spinner("유튜브 채널/동영상 검색 중..."):
+        youtube_links = get_youtube_links(search_query)
     
     if youtube_links:
         # 유튜브 리스트 및 요약 정보 표시
@@ -2290,41 +3113,36 @@ elif search_button and search_query and st.session_state.search_results.empty an
 with st.sidebar:
     st.markdown("### 📊 통계")
     
-    # 중복 제거된 강사 수 계산 (이름 + 이메일이 같으면 동일인물)
+    # 중복 제거된 강사 수 (이름 + 이메일이 같으면 동일인물, 데이터가 바뀔 때 변경분만 반영됨)
     if not df.empty:
-        # 컬럼명 찾기
-        name_cols = [col for col in df.columns if '강사' in col and '이름' in col]
-        email_cols = [col for col in df.columns if 'e-mail' in col.lower() or '이메일' in col]
-        subfield_cols = [col for col in df.columns if '소분야' in col]
-        
-        # 중복 제거된 강사 수 (이름 + 이메일 기준)
-        if name_cols and email_cols:
-            name_col = name_cols[0]
-            email_col = email_cols[0]
-            # 이름과 이메일이 모두 있는 데이터만 필터링하여 중복 제거
-            df_with_info = df[df[name_col].notna() & df[email_col].notna()]
-            unique_count = df_with_info.drop_duplicates(subset=[name_col, email_col]).shape[0]
-            
-            st.metric("총 강사 수", unique_count)
-        else:
-            # 이름이나 이메일 컬럼이 없으면 전체 행 수 표시
-            st.metric("총 강사 수", len(df))
+        st.metric("총 강사 수", instructor_stats.unique_count)
+        
+        # 데이터 로드 정보 (채택된 소스와 소스별 소요 시간)
+        load_report = df.attrs.get('load_report')
+        if load_report:
+            load_source = df.attrs.get('load_source')
+            st.caption(f"데이터 출처: {SHEET_SOURCE_LABELS.get(load_source, load_source)} ({load_report[load_source]['elapsed']:.2f}초)")
+            if uploaded_file is None and not dataset.indexed:
+                st.caption("🔄 검색 색인을 만드는 중... (그동안은 관련도순 검색과 오타 교정 없이 검색)")
+            elif uploaded_file is None and get_instructor_store().refreshing:
+                st.caption("🔄 최신 데이터를 백그라운드에서 확인하는 중...")
+            with st.expander("🔌 데이터 소스별 응답"):
+                for source_name, source_result in load_report.items():
+                    elapsed = source_result['elapsed']
+                    elapsed_text = f"{elapsed:.2f}초" if elapsed is not None else "-"
+                    st.markdown(f"• {SHEET_SOURCE_LABELS.get(source_name, source_name)}: {source_result['status']} ({elapsed_text})")
+                if df.attrs.get('sheet_revision'):
+                    st.caption(f"시트 수정 시각: {df.attrs['sheet_revision']}")
+                if dataset.delta is not None:
+                    delta = dataset.delta
+                    st.caption(f"최근 변경: 추가 {len(delta.inserted)} · 수정 {len(delta.updated)} · 삭제 {len(delta.deleted)}행")
         
         # 소분야별 강사 수 표시
-        if subfield_cols:
+        if schema.sub_field:
             st.markdown('<hr style="margin: 1.5rem 0; border: none; border-top: 1px solid #d0d0d0; opacity: 0.4;">', unsafe_allow_html=True)
             st.markdown("### 📈 소분야별 통계")
             
-            subfield_col = subfield_cols[0]
-            
-            # 중복 제거된 데이터로 소분야별 집계
-            if name_cols and email_cols:
-                df_unique = df_with_info.drop_duplicates(subset=[name_col, email_col])
-            else:
-                df_unique = df.copy()
-            
-            # 소분야별 카운트
-            subfield_counts = df_unique[subfield_col].value_counts()
+            subfield_counts = instructor_stats.subfield_counts
             
             # 상위 10개만 표시
             top_subfields = subfield_counts.head(10)
@@ -2348,15 +3166,47 @@ with st.sidebar:
                     for subfield, count in subfield_counts.items():
                         if pd.notna(subfield) and subfield != '':
                             st.markdown(f"• {subfield}: {count}명")
+        
+        # 분야별 만족도 상위 강사 (만족도 정렬 색인에서 바로 조회)
+        if schema.satisfaction and len(dataset.satisfaction.order):
+            st.markdown('<hr style="margin: 1.5rem 0; border: none; border-top: 1px solid #d0d0d0; opacity: 0.4;">', unsafe_allow_html=True)
+            st.markdown("### ⭐ 만족도 상위 강사")
+            
+            main_fields = [value for field, value in dataset.satisfaction.field_orders if field == 'main_field']
+            selected_field = st.selectbox("대분야", options=['전체'] + main_fields, key="top_satisfaction_field")
+            top_positions = dataset.satisfaction.top(
+                5,
+                field=None if selected_field == '전체' else 'main_field',
+                value=selected_field,
+                keys=instructor_stats.identity_keys.to_numpy(),
+            )
+            for rank, position in enumerate(top_positions, 1):
+                top_record = df.iloc[position]
+                top_name = schema.value(top_record, 'name') or "이름 없음"
+                st.markdown(f"{rank}. **{top_name}** ({dataset.satisfaction.scores[position]:.1f}점)")
     else:
         st.metric("총 강사 수", 0)
     
-    # 검색 기록 표시
-    if search_query and search_button:
-        results = search_instructors(df, search_query, search_type)
-        if not results.empty:
-            st.markdown('<hr style="margin: 1rem 0; border: none; border-top: 1px solid #e8e8e8; opacity: 0.5;">', unsafe_allow_html=True)
-            st.metric("검색 결과", len(results))
+    # 응답 이상으로 요청을 잠시 중단한 외부 사이트
+    for blocked_domain, remaining in get_host_guard().blocked().items():
+        st.caption(f"⏸️ {blocked_domain} 응답 이상으로 {remaining:.0f}초 동안 요청을 보내지 않습니다.")
+    
+    # 외부 정보(유튜브) 공유 캐시 사용 현황
+    enrichment_stats = get_enrichment_cache().stats()
+    if enrichment_stats:
+        with st.expander("🗂️ 외부 정보 캐시"):
+            total_hits = sum(row['hits'] + row['waits'] for row in enrichment_stats)
+            total_misses = sum(row['misses'] for row in enrichment_stats)
+            st.caption(f"재사용 {total_hits}회 · 조회 {total_misses}회")
+            for row in enrichment_stats[:10]:
+                kind, *parts = row['key']
+                label = ' / '.join(str(part) for part in parts if part)
+                st.markdown(f"• [{ENRICHMENT_KIND_LABELS.get(kind, kind)}] {label}: 적중 {row['hits']} · 대기 {row['waits']} · 조회 {row['misses']}")
+    
+    # 검색 기록 표시 (메인 목록과 같은 검색 결과 객체 사용)
+    if search_result is not None and not search_result.empty:
+        st.markdown('<hr style="margin: 1rem 0; border: none; border-top: 1px solid #e8e8e8; opacity: 0.5;">', unsafe_allow_html=True)
+        st.metric("검색 결과", len(search_result))
 
 # 푸터
 st.markdown('<hr style="margin: 2rem 0 1rem 0; border: none; border-top: 1px solid #e8e8e8; opacity: 0.5;">', unsafe_allow_html=True)
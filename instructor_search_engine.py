@@ -0,0 +1,2975 @@
+"""
+강사 검색 엔진 (Streamlit 없이 사용 가능)
+
+데이터 로드(구글 시트 CSV 내보내기, 로컬 스냅샷), 검색 색인, 통계, 검색 함수와
+다른 프로그램에서 쓸 수 있는 InstructorSearchEngine API 및 JSON HTTP 엔드포인트를 제공합니다.
+instructor_search_advanced_app.py는 이 모듈 위에 화면(Streamlit)만 구성합니다.
+
+    python instructor_search_engine.py search 마케팅 --type subject
+    python instructor_search_engine.py serve --port 8502
+"""
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
+import os
+import sys
+import requests
+import time
+import re
+import json
+import io
+import csv
+import threading
+import hashlib
+import heapq
+import bisect
+import math
+import argparse
+import urllib.parse
+from collections import defaultdict
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SPREADSHEET_ID = '1-EaykQMr06Qm9FWDOJX3CVbAZylGom1G'
+
+# 데이터 소스별 최대 대기 시간(초)
+SHEET_SOURCE_TIMEOUTS = {
+    'csv_gid': 10,   # CSV 내보내기 (gid 지정)
+    'gspread': 15,   # 서비스 계정 (gspread)
+    'csv': 10,       # CSV 내보내기 (gid 없음)
+}
+
+# 데이터 소스 표시 이름
+SHEET_SOURCE_LABELS = {
+    'snapshot': '로컬 스냅샷',
+    'csv_gid': 'CSV 내보내기 (gid)',
+    'gspread': '서비스 계정 (gspread)',
+    'csv': 'CSV 내보내기',
+}
+
+# 로컬 스냅샷 파일 경로 (Arrow IPC / Feather, 환경 변수로 변경 가능)
+SNAPSHOT_PATH = os.getenv('INSTRUCTOR_SNAPSHOT_PATH') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.cache', 'instructor_snapshot.arrow'
+)
+
+# 스냅샷 메타데이터 키 (데이터 버전, 저장 시각 등)
+SNAPSHOT_META_KEY = b'instructor_snapshot'
+
+# 시트 리비전(Drive modifiedTime) 확인 주기(초) - 변경된 경우에만 다시 다운로드
+DATA_REVISION_CHECK_INTERVAL = 60
+
+# 리비전 정보를 확인할 수 없을 때 전체 다시 다운로드 주기(초)
+DATA_REFRESH_INTERVAL = 3600
+
+# 범주형(카테고리)으로 변환할 반복값 컬럼 (컬럼 스키마의 필드명)
+CATEGORICAL_FIELDS = ('main_field', 'sub_field', 'job', 'affiliation')
+
+# 고유값 비율이 이 값 이하일 때만 범주형으로 변환 (고유값이 많으면 오히려 메모리가 늘어남)
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+
+def compute_row_hashes(df):
+    """
+    행별 내용 해시(uint64) 시리즈를 계산하는 함수 (행 ID는 해시에 포함하지 않음)
+    """
+    return pd.util.hash_pandas_object(df, index=False)
+
+def compute_data_version(df):
+    """
+    데이터 내용으로 버전 문자열(해시)을 계산하는 함수
+    인덱스 등 파생 데이터를 캐시할 때 키로 사용합니다.
+    """
+    if df.empty:
+        return 'empty'
+    
+    row_hashes = compute_row_hashes(df)
+    digest = hashlib.sha1(row_hashes.values.tobytes())
+    digest.update('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+def normalize_categorical_columns(df, schema):
+    """
+    대분야, 소분야, 직업, 소속처럼 같은 값이 반복되는 컬럼을 범주형으로 변환하는 함수
+    값 앞뒤 공백을 정리한 뒤 변환하므로 같은 값은 하나의 카테고리 코드를 공유합니다.
+    """
+    for field in CATEGORICAL_FIELDS:
+        col = getattr(schema, field)
+        if not col or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        if not (pd.api.types.is_string_dtype(df[col]) or pd.api.types.is_object_dtype(df[col])):
+            continue
+        
+        values = df[col].astype('string').str.strip().replace('', pd.NA)
+        if values.nunique() > len(values) * CATEGORICAL_MAX_UNIQUE_RATIO:
+            continue
+        df[col] = values.astype(object).where(values.notna(), None).astype('category')
+    return df
+
+def prepare_instructor_frame(df):
+    """
+    로드한 강사 데이터프레임을 정리하는 함수
+    (컬럼명 공백 제거, 반복값 컬럼 범주형 변환, 데이터 버전 기록)
+    """
+    df.columns = df.columns.str.strip()
+    normalize_categorical_columns(df, resolve_column_schema(df.columns))
+    df.attrs['data_version'] = compute_data_version(df)
+    return df
+
+def fetch_sheet_csv(url, timeout):
+    """
+    CSV 내보내기 URL에서 시트 데이터를 다운로드하는 함수
+    """
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    return pd.read_csv(io.BytesIO(response.content))
+
+def frame_from_sheet_values(values):
+    """
+    시트 셀 값 목록(첫 행은 헤더, gspread get_all_values 결과)을 데이터프레임으로 변환하는 함수
+    
+    CSV 내보내기와 같은 pd.read_csv로 해석하므로 어느 소스가 채택되어도 컬럼 타입과 빈 값(NaN)이
+    같고, 내용이 같으면 데이터 버전과 행 해시도 같습니다.
+    """
+    if len(values) < 2:
+        return pd.DataFrame()
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(values)
+    buffer.seek(0)
+    return pd.read_csv(buffer)
+
+def get_csv_sheet_sources():
+    """
+    CSV 내보내기 데이터 소스 목록 (이름 → timeout을 받아 데이터프레임을 반환하는 함수)
+    서비스 계정(gspread) 소스는 Streamlit 앱에서 추가합니다.
+    """
+    export_url = f'https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/export?format=csv'
+    return {
+        'csv_gid': lambda timeout: fetch_sheet_csv(f'{export_url}&gid=0', timeout),
+        'csv': lambda timeout: fetch_sheet_csv(export_url, timeout),
+    }
+
+def race_sheet_sources(sources, timeouts):
+    """
+    여러 데이터 소스를 동시에 시작하여 가장 먼저 유효한 데이터를 반환한 소스를 채택하는 함수
+    
+    각 소스는 timeouts에 지정된 시간까지만 기다리며, 채택 후 남은 소스는 취소합니다.
+    (이미 실행 중인 요청은 자체 timeout으로 종료되며 결과는 버려집니다)
+    
+    Returns:
+        (데이터프레임, 채택된 소스 이름, 소스별 결과 {'status', 'elapsed'})
+    """
+    started = time.perf_counter()
+    report = {name: {'status': 'pending', 'elapsed': None} for name in sources}
+    deadlines = {name: started + timeouts[name] for name in sources}
+    winner, winner_df = None, pd.DataFrame()
+    
+    executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix='sheet-source')
+    futures = {executor.submit(fetch, timeouts[name]): name for name, fetch in sources.items()}
+    pending = set(futures)
+    
+    try:
+        while pending and winner is None:
+            # 마감 시간이 지난 소스는 포기
+            now = time.perf_counter()
+            for future in [f for f in pending if now >= deadlines[futures[f]]]:
+                report[futures[future]] = {'status': 'timeout', 'elapsed': now - started}
+                future.cancel()
+                pending.discard(future)
+            if not pending:
+                break
+            
+            next_deadline = min(deadlines[futures[f]] for f in pending)
+            done, pending = wait(pending, timeout=max(next_deadline - now, 0), return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                name = futures[future]
+                elapsed = time.perf_counter() - started
+                try:
+                    df = future.result()
+                except Exception:
+                    report[name] = {'status': 'failed', 'elapsed': elapsed}
+                    continue
+                
+                if df is None or df.empty:
+                    report[name] = {'status': 'empty', 'elapsed': elapsed}
+                elif winner is None:
+                    winner, winner_df = name, df
+                    report[name] = {'status': 'won', 'elapsed': elapsed}
+                else:
+                    report[name] = {'status': 'finished', 'elapsed': elapsed}
+    finally:
+        now = time.perf_counter()
+        for future in pending:
+            future.cancel()
+            report[futures[future]] = {'status': 'cancelled', 'elapsed': now - started}
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return winner_df, winner, report
+
+def fetch_instructor_data(sources=None):
+    """
+    구글 시트에서 강사 데이터 다운로드
+    sources의 데이터 소스를 동시에 시도하여 가장 먼저 유효한 데이터를 반환한 소스를 사용합니다.
+    (지정하지 않으면 CSV 내보내기 소스만 사용)
+    """
+    df, source, report = race_sheet_sources(sources or get_csv_sheet_sources(), SHEET_SOURCE_TIMEOUTS)
+    if df.empty:
+        return pd.DataFrame()
+    
+    df = prepare_instructor_frame(df)
+    df.attrs['load_source'] = source
+    df.attrs['load_report'] = report
+    return df
+
+def write_instructor_snapshot(df, path):
+    """
+    강사 데이터를 로컬 스냅샷 파일(Arrow IPC / Feather)로 저장하는 함수
+    임시 파일에 먼저 쓴 뒤 교체하므로 읽는 쪽에서 반쯤 쓰인 파일을 보지 않습니다.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SNAPSHOT_META_KEY] = json.dumps({
+        'data_version': df.attrs.get('data_version'),
+        'source': df.attrs.get('load_source'),
+        'revision': df.attrs.get('sheet_revision'),
+        'saved_at': time.time(),
+    }).encode('utf-8')
+    table = table.replace_schema_metadata(metadata)
+    
+    tmp_path = f"{path}.tmp"
+    feather.write_feather(table, tmp_path)
+    os.replace(tmp_path, path)
+
+def read_instructor_snapshot(path):
+    """
+    로컬 스냅샷 파일에서 강사 데이터를 읽는 함수 (파일이 없으면 None)
+    """
+    if not os.path.exists(path):
+        return None
+    
+    started = time.perf_counter()
+    table = feather.read_table(path, memory_map=True)
+    snapshot_meta = json.loads((table.schema.metadata or {}).get(SNAPSHOT_META_KEY, b'{}'))
+    df = table.to_pandas()
+    
+    df.attrs['data_version'] = snapshot_meta.get('data_version') or compute_data_version(df)
+    df.attrs['load_source'] = 'snapshot'
+    df.attrs['load_report'] = {'snapshot': {'status': 'won', 'elapsed': time.perf_counter() - started}}
+    df.attrs['sheet_revision'] = snapshot_meta.get('revision')
+    df.attrs['snapshot_saved_at'] = snapshot_meta.get('saved_at')
+    return df
+
+class InstructorStore:
+    """
+    프로세스 전체에서 공유하는 강사 데이터 보관소
+    
+    시작 시 로컬 스냅샷이 있으면 검색 색인 없이(컬럼 스캔 검색) 즉시 제공하고, 백그라운드
+    스레드에서 검색 색인을 만들어 교체한 뒤 구글 시트의 최신 데이터를 받아와 교체합니다.
+    스냅샷이 없을 때만 첫 로드를 기다립니다.
+    
+    갱신 시에는 먼저 시트 리비전(Drive modifiedTime)을 확인하여 바뀐 경우에만 다시
+    다운로드하고, 받은 데이터의 내용 해시가 같으면 기존 데이터를 그대로 유지합니다.
+    내용이 바뀐 경우에도 추가/수정/삭제된 행만 검색 색인과 통계에 반영합니다.
+    """
+    
+    def __init__(self, fetch, check_revision=None, snapshot_path=SNAPSHOT_PATH,
+                 revision_check_interval=DATA_REVISION_CHECK_INTERVAL, refresh_interval=DATA_REFRESH_INTERVAL):
+        self._fetch = fetch
+        self._check_revision = check_revision
+        self.snapshot_path = snapshot_path
+        self.revision_check_interval = revision_check_interval
+        self.refresh_interval = refresh_interval
+        self._dataset = InstructorDataset.build(pd.DataFrame())
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        self.revision = None            # 현재 데이터의 시트 리비전
+        self.revision_supported = None  # 리비전 확인 가능 여부 (첫 확인 전에는 None)
+        self.last_refresh_at = None     # 마지막 갱신 시작 시각
+        self.last_changed_at = None     # 마지막으로 데이터가 실제로 바뀐 시각
+        self.last_delta = None          # 마지막 변경의 행 단위 변경분
+        self.last_error = None
+    
+    @property
+    def dataset(self):
+        return self._dataset
+    
+    @property
+    def frame(self):
+        return self._dataset.frame
+    
+    @property
+    def refreshing(self):
+        thread = self._refresh_thread
+        return thread is not None and thread.is_alive()
+    
+    def start(self):
+        """
+        스냅샷을 읽어 즉시 사용 가능하게 하고, 최신 데이터 갱신을 시작
+        """
+        snapshot = None
+        try:
+            snapshot = read_instructor_snapshot(self.snapshot_path)
+        except Exception as e:
+            self.last_error = f"스냅샷 읽기 실패: {str(e)}"
+        
+        if snapshot is not None and not snapshot.empty:
+            # 텍스트 검색 색인은 백그라운드에서 생성 (그동안은 컬럼 스캔으로 검색)
+            self._dataset = InstructorDataset.build(snapshot, text_indexes=False)
+            self.revision = snapshot.attrs.get('sheet_revision')
+            self.refresh_in_background()
+        else:
+            # 스냅샷이 없으면 첫 로드는 동기로 진행
+            self.last_refresh_at = time.time()
+            self.refresh()
+        return self
+    
+    def refresh(self):
+        """
+        시트가 바뀐 경우에만 데이터를 받아 교체하고 스냅샷을 갱신 (데이터 교체 여부 반환)
+        """
+        revision = self._check_revision() if self._check_revision else None
+        self.revision_supported = revision is not None
+        if revision is not None and revision == self.revision and not self.frame.empty:
+            # 리비전이 같으면 다운로드하지 않음
+            return False
+        
+        try:
+            df = self._fetch()
+        except Exception as e:
+            self.last_error = f"데이터 갱신 실패: {str(e)}"
+            return False
+        
+        if df is None or df.empty:
+            return False
+        
+        df.attrs['sheet_revision'] = revision
+        current = self._dataset
+        changed = current.frame.empty or df.attrs.get('data_version') != current.version
+        # 변경분 계산은 잠금 밖에서 수행 (기존 데이터셋은 그동안 계속 사용 가능)
+        dataset = current.apply_changes(df) if changed else None
+        
+        with self._lock:
+            self.revision = revision
+            if changed:
+                self._dataset = dataset
+                self.last_delta = dataset.delta
+                self.last_changed_at = time.time()
+            else:
+                # 내용이 같으면 기존 데이터(및 그에 묶인 색인/통계)를 그대로 사용
+                current.frame.attrs['sheet_revision'] = revision
+        
+        try:
+            write_instructor_snapshot(self.frame, self.snapshot_path)
+        except Exception as e:
+            self.last_error = f"스냅샷 저장 실패: {str(e)}"
+        return changed
+    
+    def build_indexes(self):
+        """
+        검색 색인 없이 제공 중인 데이터셋의 색인을 만들어 교체 (색인 교체 여부 반환)
+        색인을 만드는 동안 데이터가 교체되었으면 만든 색인은 버립니다.
+        """
+        current = self._dataset
+        if current.indexed:
+            return False
+        dataset = current.with_text_indexes()
+        with self._lock:
+            if self._dataset is not current:
+                return False
+            self._dataset = dataset
+        return True
+    
+    def _refresh_with_indexes(self):
+        # 색인을 먼저 교체한 뒤 갱신 (변경분 반영은 색인이 있는 데이터셋에서만 가능)
+        self.build_indexes()
+        self.refresh()
+    
+    def refresh_in_background(self):
+        """
+        백그라운드 스레드에서 갱신 시작 (이미 갱신 중이면 무시)
+        """
+        with self._lock:
+            if self.refreshing:
+                return False
+            self.last_refresh_at = time.time()
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_with_indexes, name='instructor-refresh', daemon=True
+            )
+            self._refresh_thread.start()
+        return True
+    
+    def maybe_refresh(self):
+        """
+        확인 주기가 지났으면 백그라운드 갱신 시작
+        리비전을 확인할 수 있으면 짧은 주기로, 없으면 전체 다운로드 주기로 확인합니다.
+        """
+        interval = self.revision_check_interval if self.revision_supported else self.refresh_interval
+        if self.last_refresh_at is None or time.time() - self.last_refresh_at >= interval:
+            self.refresh_in_background()
+
+@dataclass(frozen=True)
+class InstructorSchema:
+    """
+    시트의 논리 필드(이름, 이메일, 소속 등)와 실제 컬럼명의 매핑
+    데이터 로드 시 한 번만 계산하여 검색/상세 정보/통계에서 함께 사용합니다.
+    """
+    name: str = None
+    email: str = None
+    affiliation: str = None
+    job: str = None
+    subject: str = None
+    main_field: str = None
+    sub_field: str = None
+    satisfaction: str = None
+    feedback: str = None
+    manager_comment: str = None
+    # 검색 범위별 대상 컬럼 (강사이름/분야/강의과목)
+    name_columns: tuple = ()
+    field_columns: tuple = ()
+    subject_columns: tuple = ()
+    
+    def search_groups(self):
+        """
+        검색 범위별 대상 컬럼 딕셔너리 반환
+        """
+        return {
+            'name': list(self.name_columns),
+            'field': list(self.field_columns),
+            'subject': list(self.subject_columns),
+        }
+    
+    def fulltext_groups(self):
+        """
+        전문 색인 대상 그룹별 컬럼 딕셔너리 반환 (학습자 주요 의견, 담당자 의견)
+        """
+        return {
+            'feedback': [col for col in (self.feedback, self.manager_comment) if col],
+        }
+    
+    def rank_groups(self):
+        """
+        관련도순 검색(BM25) 대상 필드별 컬럼 딕셔너리 반환
+        """
+        return {
+            'subject': list(self.subject_columns),
+            'field': list(self.field_columns),
+            'feedback': [self.feedback] if self.feedback else [],
+        }
+    
+    def value(self, record, field):
+        """
+        레코드(dict 또는 Series)에서 논리 필드 값을 가져오는 함수 (컬럼이 없거나 빈 값이면 None)
+        """
+        col = getattr(self, field)
+        if col is None:
+            return None
+        value = record.get(col)
+        if value is None or pd.isna(value):
+            return None
+        return value
+
+def resolve_column_schema(columns):
+    """
+    컬럼명 목록에서 논리 필드별 실제 컬럼을 찾는 함수
+    """
+    columns = list(columns)
+    
+    def first(matches):
+        return matches[0] if matches else None
+    
+    name_columns = [col for col in columns if '강사' in col and '이름' in col]
+    subject_columns = [col for col in columns if '강의' in col and '과목' in col]
+    manager_comment = first([col for col in columns if '담당자' in col])
+    feedback = first([col for col in columns if '학습자' in col]) or first(
+        [col for col in columns if '의견' in col and col != manager_comment]
+    )
+    
+    return InstructorSchema(
+        name=first(name_columns),
+        email=first([col for col in columns if 'e-mail' in col.lower() or '이메일' in col]),
+        affiliation=first([col for col in columns if '소속' in col]),
+        job=first([col for col in columns if '직업' in col]),
+        subject=first(subject_columns),
+        main_field=first([col for col in columns if '대분야' in col]),
+        sub_field=first([col for col in columns if '소분야' in col]),
+        satisfaction=first([col for col in columns if '만족도' in col]),
+        feedback=feedback,
+        manager_comment=manager_comment,
+        name_columns=tuple(name_columns),
+        field_columns=tuple(col for col in columns if any(x in col for x in ['대분야', '소분야', '분야'])),
+        subject_columns=tuple(subject_columns),
+    )
+
+def build_identity_keys(df, schema):
+    """
+    강사 식별 키(이름 + 이메일) 시리즈를 만드는 함수
+    이름과 이메일이 같으면 동일인물로 판단하며, 둘 중 하나라도 없으면 키는 None입니다.
+    """
+    if not (schema.name and schema.email):
+        return pd.Series([None] * len(df), index=df.index, dtype=object)
+    
+    names = df[schema.name]
+    emails = df[schema.email]
+    has_identity = names.notna() & emails.notna()
+    keys = names.astype(str) + '\x1f' + emails.astype(str)
+    return keys.where(has_identity, None).astype(object)
+
+@dataclass(frozen=True)
+class InstructorStats:
+    """
+    데이터 버전별로 미리 계산해 두는 강사 식별 키와 사이드바 집계값
+    """
+    identity_keys: pd.Series    # 행 ID별 식별 키 (이름 + 이메일, 없으면 None)
+    by_identity: bool           # 식별 키 기준 집계 여부 (이름/이메일 컬럼이 없으면 행 단위 집계)
+    identity_rows: dict         # 집계 키 → 행 ID 목록 (시트 순서, 첫 번째 행이 대표 행)
+    subfield_counts: pd.Series  # 소분야별 강사 수 (내림차순)
+    
+    @property
+    def unique_count(self):
+        """
+        중복 제거된 강사 수
+        """
+        return len(self.identity_rows)
+
+def _stat_keys(df, schema, identity_keys):
+    # 집계 키: 이름/이메일 컬럼이 있으면 식별 키, 없으면 행 ID (모든 행을 집계)
+    if schema.name and schema.email:
+        return identity_keys
+    return pd.Series(df.index, index=df.index, dtype=object)
+
+def _count_subfields(counts, df, schema, row_id, delta):
+    # 대표 행의 소분야 집계값을 delta만큼 변경
+    if not schema.sub_field:
+        return
+    subfield = df.at[row_id, schema.sub_field]
+    if pd.isna(subfield):
+        return
+    counts[subfield] = counts.get(subfield, 0) + delta
+    if counts[subfield] <= 0:
+        del counts[subfield]
+
+def _subfield_series(counts):
+    return pd.Series(counts, dtype='int64').sort_values(ascending=False, kind='stable')
+
+def compute_instructor_stats(df, schema):
+    """
+    식별 키, 중복 제거된 강사 수, 소분야별 강사 수를 계산하는 함수
+    이름과 이메일이 모두 있는 행만 대상으로 중복 제거하며, 두 컬럼이 없으면 전체 행을 사용합니다.
+    """
+    identity_keys = build_identity_keys(df, schema)
+    stat_keys = _stat_keys(df, schema, identity_keys).dropna()
+    
+    identity_rows = {}
+    for row_id, key in zip(stat_keys.index, stat_keys.to_numpy()):
+        identity_rows.setdefault(key, []).append(row_id)
+    
+    # 대표 행의 소분야 집계 (범주형 컬럼이면 정수 코드 단위로 집계됨)
+    counts = {}
+    if schema.sub_field and identity_rows:
+        representatives = [rows[0] for rows in identity_rows.values()]
+        value_counts = df.loc[representatives, schema.sub_field].value_counts()
+        counts = {value: int(count) for value, count in value_counts.items() if count > 0}
+    
+    return InstructorStats(
+        identity_keys=identity_keys,
+        by_identity=bool(schema.name and schema.email),
+        identity_rows=identity_rows,
+        subfield_counts=_subfield_series(counts),
+    )
+
+def update_instructor_stats(stats, old_df, new_df, schema, delta, identity_keys=None):
+    """
+    행 단위 변경분(RowDelta)만 반영하여 통계를 갱신하는 함수
+    변경된 행의 집계 키에 대해서만 대표 행과 소분야 집계를 다시 계산합니다.
+    identity_keys: 새 데이터의 행 ID별 식별 키 (이미 계산했으면 전달, 없으면 새로 계산)
+    """
+    if identity_keys is None:
+        identity_keys = build_identity_keys(new_df, schema)
+    old_keys = _stat_keys(old_df, schema, stats.identity_keys)
+    new_keys = _stat_keys(new_df, schema, identity_keys)
+    
+    affected = set()
+    for row_id in delta.deleted + delta.updated:
+        affected.add(old_keys.at[row_id])
+    for row_id in delta.inserted + delta.updated:
+        affected.add(new_keys.at[row_id])
+    affected.discard(None)
+    affected = {key for key in affected if not pd.isna(key)}
+    
+    identity_rows = dict(stats.identity_rows)
+    counts = stats.subfield_counts.to_dict()
+    
+    # 영향받는 키의 기존 대표 행 집계를 빼고
+    for key in affected:
+        rows = identity_rows.pop(key, None)
+        if rows:
+            _count_subfields(counts, old_df, schema, rows[0], -1)
+    
+    # 새 데이터 기준으로 행 목록과 대표 행 집계를 다시 추가
+    affected_keys = new_keys[new_keys.isin(affected)]
+    for row_id, key in zip(affected_keys.index, affected_keys.to_numpy()):
+        identity_rows.setdefault(key, []).append(row_id)
+    for key in affected:
+        rows = identity_rows.get(key)
+        if rows:
+            _count_subfields(counts, new_df, schema, rows[0], 1)
+    
+    return InstructorStats(
+        identity_keys=identity_keys,
+        by_identity=stats.by_identity,
+        identity_rows=identity_rows,
+        subfield_counts=_subfield_series(counts),
+    )
+
+# 검색 범위별로 조회할 컬럼 그룹
+SEARCH_TYPE_GROUPS = {
+    'all': ['name', 'field', 'subject', 'feedback'],
+    'name': ['name'],
+    'field': ['field'],
+    'subject': ['subject'],
+    'feedback': ['feedback'],
+}
+
+# 전문(full-text) 색인으로 검색하는 컬럼 그룹 (학습자 주요 의견, 담당자 의견)
+FULLTEXT_SEARCH_GROUPS = ('feedback',)
+
+# 역색인에 저장할 문자 n-gram 크기
+SEARCH_NGRAM_SIZES = (1, 2, 3)
+
+# 변경분 색인이 이전 색인의 사전 위에 쌓을 수 있는 최대 층 수 (넘으면 한 사전으로 합침)
+INDEX_MAX_LAYERS = 4
+
+# 만족도 정렬 배열에 변경된 행을 하나씩 끼워 넣는 최대 행 수 (넘으면 전체 다시 정렬)
+SATISFACTION_PATCH_MAX_ROWS = 256
+
+# 초성/입력 중인 글자 검색을 지원하는 컬럼 그룹
+CHOSEONG_SEARCH_GROUPS = ('name', 'subject')
+
+# 관련도순 검색(BM25) 필드별 가중치와 검색 범위별 대상 필드
+RANK_FIELD_WEIGHTS = {'subject': 1.5, 'field': 1.0, 'feedback': 0.5}
+RANK_SEARCH_TYPE_GROUPS = {
+    'all': ['subject', 'field', 'feedback'],
+    'field': ['field'],
+    'subject': ['subject'],
+    'feedback': ['feedback'],
+}
+
+# 관련도순 검색 결과 수와 BM25 파라미터
+RANK_TOP_K = 20
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 검색 결과 좁히기(패싯) 대상 필드와 표시 이름
+FACET_LABELS = {
+    'main_field': '대분야',
+    'sub_field': '소분야',
+    'job': '직업',
+    'satisfaction': '만족도',
+}
+
+# 만족도 구간 (5점 만점 기준, 이상 ~ 미만)
+SATISFACTION_BANDS = (
+    ('4.5점 이상', 4.5, float('inf')),
+    ('4.0~4.5점', 4.0, 4.5),
+    ('4.0점 미만', float('-inf'), 4.0),
+)
+SATISFACTION_UNKNOWN_LABEL = '정보 없음'
+
+# 오타 교정(퍼지 검색) 대상 컬럼 그룹
+FUZZY_SEARCH_GROUPS = ('name', 'subject')
+
+# 오타 교정 최대 편집 거리 (검색어가 짧을수록 작게) 및 삭제 사전에 쓰는 접두사 길이
+FUZZY_MAX_DISTANCE = 2
+FUZZY_SHORT_QUERY_LENGTH = 4  # 이 길이 이하의 검색어는 편집 거리 1까지만 허용
+FUZZY_PREFIX_LENGTH = 7
+
+# 명단 일괄 조회 결과 구분과 일치 기준 표시 이름
+ROSTER_STATUS_LABELS = {
+    'matched': '시트에 있음',
+    'fuzzy': '비슷한 이름',
+    'unknown': '시트에 없음',
+}
+ROSTER_BASIS_LABELS = {
+    'name_email': '이름+이메일',
+    'name': '이름',
+    'email': '이메일',
+    'fuzzy': '비슷한 이름',
+}
+
+# 명단 일괄 조회에서 일치하는 이름이 없을 때 보여줄 비슷한 이름 후보 수
+ROSTER_FUZZY_CANDIDATES = 3
+
+# 명단 이름 뒤에 붙은 호칭 (비교 전에 제거)
+ROSTER_NAME_SUFFIX_PATTERN = r'\s+(?:교수|강사|박사|대표|선생)?님?$'
+
+# 한글 음절 범위와 초성 목록 (음절 = 0xAC00 + (초성 * 21 + 중성) * 28 + 종성)
+HANGUL_SYLLABLE_START = 0xAC00
+HANGUL_SYLLABLE_END = 0xD7A3
+HANGUL_CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+HANGUL_CHOSEONG_SPAN = 21 * 28  # 초성 하나에 해당하는 음절 수
+HANGUL_JONGSEONG_COUNT = 28
+
+# 한글 음절 → 초성 변환표 (str.translate 용)
+_CHOSEONG_TABLE = {
+    code: HANGUL_CHOSEONG[(code - HANGUL_SYLLABLE_START) // HANGUL_CHOSEONG_SPAN]
+    for code in range(HANGUL_SYLLABLE_START, HANGUL_SYLLABLE_END + 1)
+}
+
+def to_choseong(text):
+    """
+    한글 음절을 초성으로 바꾼 문자열을 반환하는 함수 (예: '김양민' → 'ㄱㅇㅁ', 한글 외 문자는 유지)
+    """
+    return text.translate(_CHOSEONG_TABLE)
+
+def hangul_partial_pattern(query):
+    """
+    초성이나 입력 중인 글자가 포함된 검색어를 음절 범위 정규식으로 바꾸는 함수
+    
+    - 초성(ㄱ, ㅇ 등)은 그 초성으로 시작하는 모든 음절과 매칭 ('ㄱㅇㅁ' → 김양민)
+    - 마지막 글자가 받침 없는 음절이면 같은 초성+중성의 모든 음절과 매칭 ('김야' → 김양민)
+    
+    확장할 글자가 없으면 None을 반환합니다 (일반 부분 일치로 충분).
+    """
+    parts = []
+    expanded = False
+    for position, char in enumerate(query):
+        code = ord(char)
+        if char in HANGUL_CHOSEONG:
+            start = HANGUL_SYLLABLE_START + HANGUL_CHOSEONG.index(char) * HANGUL_CHOSEONG_SPAN
+            parts.append(f"[{char}{chr(start)}-{chr(start + HANGUL_CHOSEONG_SPAN - 1)}]")
+            expanded = True
+        elif (position == len(query) - 1
+              and HANGUL_SYLLABLE_START <= code <= HANGUL_SYLLABLE_END
+              and (code - HANGUL_SYLLABLE_START) % HANGUL_JONGSEONG_COUNT == 0):
+            parts.append(f"[{char}-{chr(code + HANGUL_JONGSEONG_COUNT - 1)}]")
+            expanded = True
+        else:
+            parts.append(re.escape(char))
+    
+    if not expanded:
+        return None
+    return re.compile(''.join(parts))
+
+class LayeredDict(MutableMapping):
+    """
+    이전 색인의 사전을 복사하지 않고 공유하면서, 바뀐 키만 새 층에 저장하는 사전 (키 단위 copy-on-write)
+    
+    조회는 위 층부터 찾고, 삭제한 키는 표시만 남깁니다. 아래 층(이전 색인의 사전)은 수정하지 않으므로
+    이전 색인을 읽는 세션에 영향이 없습니다. 변경분이 계속 쌓여 층이 INDEX_MAX_LAYERS를 넘으면
+    한 사전으로 합쳐 조회가 느려지지 않게 합니다.
+    """
+    
+    _DELETED = object()
+    _MISSING = object()
+    
+    def __init__(self, base=None):
+        if isinstance(base, LayeredDict):
+            layers = base._layers if len(base._layers) < INDEX_MAX_LAYERS else (base._flatten(),)
+            self._length = len(base)
+        else:
+            layers = (base if base is not None else {},)
+            self._length = len(layers[0])
+        self._layers = ({},) + layers
+    
+    def _flatten(self):
+        merged = dict(self._layers[-1])
+        for layer in reversed(self._layers[:-1]):
+            for key, value in layer.items():
+                if value is self._DELETED:
+                    merged.pop(key, None)
+                else:
+                    merged[key] = value
+        return merged
+    
+    def get(self, key, default=None):
+        for layer in self._layers:
+            value = layer.get(key, self._MISSING)
+            if value is not self._MISSING:
+                return default if value is self._DELETED else value
+        return default
+    
+    def __getitem__(self, key):
+        value = self.get(key, self._MISSING)
+        if value is self._MISSING:
+            raise KeyError(key)
+        return value
+    
+    def __contains__(self, key):
+        return self.get(key, self._MISSING) is not self._MISSING
+    
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._length += 1
+        self._layers[0][key] = value
+    
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._layers[0][key] = self._DELETED
+        self._length -= 1
+    
+    def __len__(self):
+        return self._length
+    
+    def __iter__(self):
+        if len(self._layers) == 1:
+            yield from self._layers[0]
+            return
+        seen = set()
+        for layer in self._layers:
+            for key, value in layer.items():
+                if key in seen:
+                    continue
+                seen.add(key)
+                if value is not self._DELETED:
+                    yield key
+
+class NgramIndex:
+    """
+    강사 데이터 검색용 문자 n-gram 역색인
+    
+    컬럼 그룹(강사이름/분야/강의과목)별로 1~3글자 n-gram → 행 ID 집합을 저장합니다.
+    3글자 이하 검색어는 한 번의 조회로, 그보다 긴 검색어는 n-gram 후보 교집합을
+    구한 뒤 후보 행만 문자열 포함 여부로 검증합니다.
+    """
+    
+    # 한 행의 여러 컬럼 값을 이어 붙일 때 쓰는 구분자 (컬럼 경계를 넘는 매칭 방지)
+    SEPARATOR = '\x00'
+    
+    def __init__(self, sizes=SEARCH_NGRAM_SIZES):
+        self.sizes = tuple(sizes)
+        self.max_n = max(self.sizes)
+        self.texts = defaultdict(dict)      # group -> {row_id: 소문자 텍스트}
+        self.postings = defaultdict(lambda: defaultdict(set))  # group -> {gram: {row_id}}
+    
+    @classmethod
+    def build(cls, df, column_groups):
+        """
+        데이터프레임과 컬럼 그룹으로 역색인을 생성
+        """
+        index = cls()
+        for group, cols in column_groups.items():
+            if not cols:
+                continue
+            values = [df[col].tolist() for col in cols]
+            for row_id, row_values in zip(df.index, zip(*values)):
+                index.add_row(group, row_id, row_values)
+        return index
+    
+    def add_row(self, group, row_id, values):
+        """
+        한 행의 컬럼 값들을 색인에 추가
+        """
+        text = self._row_text(values)
+        if not text:
+            return
+        
+        self.texts[group][row_id] = text
+        group_postings = self.postings[group]
+        for gram in self._grams(text):
+            group_postings[gram].add(row_id)
+    
+    def with_changes(self, removed_ids, added_rows):
+        """
+        행 단위 변경분을 반영한 새 색인을 반환 (기존 색인은 수정하지 않음)
+        
+        removed_ids: 제거할 행 ID 목록 (내용이 바뀐 행도 포함)
+        added_rows: {group: [(row_id, 컬럼 값들), ...]} 추가할 행 (내용이 바뀐 행도 포함)
+        
+        그룹별 사전은 복사하지 않고 LayeredDict로 공유하며, 실제로 행 집합이 바뀐 n-gram만 새로 만듭니다.
+        (수정된 행에서 그대로인 n-gram은 건드리지 않음)
+        """
+        index = type(self)(self.sizes)
+        for group in set(self.texts) | set(added_rows):
+            texts = LayeredDict(self.texts.get(group))
+            postings = LayeredDict(self.postings.get(group))
+            removals = defaultdict(set)
+            additions = defaultdict(set)
+            
+            for row_id in removed_ids:
+                text = texts.pop(row_id, None)
+                if text:
+                    for gram in self._grams(text):
+                        removals[gram].add(row_id)
+            
+            for row_id, values in added_rows.get(group, []):
+                text = self._row_text(values)
+                if text:
+                    texts[row_id] = text
+                    for gram in self._grams(text):
+                        additions[gram].add(row_id)
+            
+            for gram in set(removals) | set(additions):
+                if removals.get(gram) == additions.get(gram):
+                    continue
+                row_ids = (postings.get(gram, set()) - removals.get(gram, set())) | additions.get(gram, set())
+                if row_ids:
+                    postings[gram] = row_ids
+                else:
+                    postings.pop(gram, None)
+            
+            index.texts[group] = texts
+            index.postings[group] = postings
+        return index
+    
+    def _row_text(self, values):
+        return self.SEPARATOR.join(
+            str(value).lower() for value in values if value is not None and not pd.isna(value)
+        )
+    
+    def _grams(self, text):
+        grams = set()
+        for n in self.sizes:
+            for i in range(len(text) - n + 1):
+                gram = text[i:i + n]
+                if self.SEPARATOR not in gram:
+                    grams.add(gram)
+        return grams
+    
+    def lookup(self, group, query):
+        """
+        그룹 내에서 검색어(부분 일치, 대소문자 무시)를 포함하는 행 ID 집합 반환
+        """
+        query = query.lower()
+        group_postings = self.postings.get(group)
+        if not query or not group_postings:
+            return set()
+        
+        # 색인된 n-gram 길이 이하의 검색어는 색인 조회만으로 정확한 결과
+        if len(query) <= self.max_n:
+            return set(group_postings.get(query, ()))
+        
+        # 긴 검색어: n-gram 후보 교집합 후 실제 포함 여부 검증
+        n = self.max_n
+        query_grams = {query[i:i + n] for i in range(len(query) - n + 1)}
+        candidate_sets = sorted((group_postings.get(gram, set()) for gram in query_grams), key=len)
+        if not candidate_sets[0]:
+            return set()
+        
+        candidates = candidate_sets[0].intersection(*candidate_sets[1:])
+        texts = self.texts.get(group, {})
+        return {row_id for row_id in candidates if query in texts[row_id]}
+
+class ChoseongIndex(NgramIndex):
+    """
+    초성 문자열에 대한 n-gram 역색인
+    
+    각 행의 텍스트를 미리 초성으로 변환해 색인하므로, 초성/입력 중인 글자 검색어도
+    검색할 때마다 문자열을 분해하지 않고 한 번의 조회로 후보 행을 찾습니다.
+    """
+    
+    def _row_text(self, values):
+        return to_choseong(super()._row_text(values))
+    
+    def lookup_partial(self, group, query, pattern, raw_texts):
+        """
+        검색어의 초성으로 후보 행을 찾은 뒤, 원문 텍스트가 음절 범위 정규식과 맞는 행 ID 집합 반환
+        raw_texts: 같은 그룹의 원문 텍스트 ({row_id: 소문자 텍스트}, NgramIndex.texts[group])
+        """
+        candidates = self.lookup(group, to_choseong(query))
+        return {row_id for row_id in candidates if pattern.search(raw_texts.get(row_id, ''))}
+
+def edit_distance(a, b, max_distance):
+    """
+    두 문자열의 편집 거리(인접 문자 교환 포함)를 계산하는 함수
+    max_distance를 넘으면 계산을 멈추고 max_distance + 1을 반환합니다.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+class FuzzyIndex:
+    """
+    오타 교정용 삭제 사전(SymSpell 방식) 색인
+    
+    강사이름과 강의 과목의 단어(및 전체 값)마다 최대 편집 거리만큼 글자를 지운 변형을
+    미리 만들어 두고, 검색어의 삭제 변형과 겹치는 단어만 편집 거리로 검증합니다.
+    검색 결과가 없을 때 외부 검색 전에 시트 안의 비슷한 이름/과목을 빠르게 찾는 데 사용합니다.
+    """
+    
+    def __init__(self, max_distance=FUZZY_MAX_DISTANCE, prefix_length=FUZZY_PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.term_rows = defaultdict(dict)  # group -> {단어: {row_id}}
+        self.row_terms = defaultdict(dict)  # group -> {row_id: {단어}}
+        self.deletes = {}                   # 삭제 변형 -> {단어}
+    
+    @classmethod
+    def build(cls, df, column_groups):
+        """
+        데이터프레임과 컬럼 그룹으로 삭제 사전을 생성
+        """
+        index = cls()
+        for group, cols in column_groups.items():
+            if not cols:
+                continue
+            values = [df[col].tolist() for col in cols]
+            for row_id, row_values in zip(df.index, zip(*values)):
+                index._add_row(group, row_id, row_values)
+        return index
+    
+    def with_changes(self, removed_ids, added_rows):
+        """
+        행 단위 변경분을 반영한 새 색인을 반환 (기존 색인은 수정하지 않음)
+        삭제 사전은 단어를 추가만 하며, 더 이상 없는 단어는 조회할 때 걸러집니다.
+        사전은 LayeredDict로 공유하고, 수정된 행은 바뀐 단어만 반영합니다.
+        """
+        index = type(self)(self.max_distance, self.prefix_length)
+        index.deletes = LayeredDict(self.deletes)
+        for group in set(self.term_rows) | set(added_rows):
+            term_rows = LayeredDict(self.term_rows.get(group))
+            row_terms = LayeredDict(self.row_terms.get(group))
+            new_terms = {row_id: self._terms(values) for row_id, values in added_rows.get(group, [])}
+            old_terms = {}
+            for row_id in removed_ids:
+                terms = row_terms.pop(row_id, None)
+                if not terms:
+                    continue
+                old_terms[row_id] = terms
+                for term in terms - new_terms.get(row_id, set()):
+                    rows = term_rows[term] - {row_id}
+                    if rows:
+                        term_rows[term] = rows
+                    else:
+                        del term_rows[term]
+            index.term_rows[group] = term_rows
+            index.row_terms[group] = row_terms
+            for row_id, terms in new_terms.items():
+                if terms:
+                    row_terms[row_id] = terms
+                    index._add_terms(group, row_id, terms - old_terms.get(row_id, set()), copy_on_write=True)
+        return index
+    
+    def _add_row(self, group, row_id, values):
+        terms = self._terms(values)
+        if not terms:
+            return
+        self.row_terms[group][row_id] = terms
+        self._add_terms(group, row_id, terms)
+    
+    def _add_terms(self, group, row_id, terms, copy_on_write=False):
+        term_rows = self.term_rows[group]
+        for term in terms:
+            if term in term_rows:
+                if copy_on_write:
+                    term_rows[term] = term_rows[term] | {row_id}
+                else:
+                    term_rows[term].add(row_id)
+                continue
+            term_rows[term] = {row_id}
+            for variant in self._deletes(term[:self.prefix_length], self.max_distance):
+                if copy_on_write:
+                    self.deletes[variant] = self.deletes.get(variant, frozenset()) | {term}
+                else:
+                    self.deletes.setdefault(variant, set()).add(term)
+    
+    @staticmethod
+    def _terms(values):
+        # 전체 값과 공백으로 나눈 단어를 모두 교정 대상 단어로 사용
+        terms = set()
+        for value in values:
+            if value is None or pd.isna(value):
+                continue
+            text = str(value).strip().lower()
+            if not text:
+                continue
+            terms.add(text)
+            terms.update(word for word in text.split() if len(word) > 1)
+        return terms
+    
+    @staticmethod
+    def _deletes(term, max_distance):
+        # 글자를 최대 max_distance개 지운 모든 변형 (원래 단어 포함)
+        variants = {term}
+        frontier = {term}
+        for _ in range(max_distance):
+            frontier = {word[:i] + word[i + 1:] for word in frontier if len(word) > 1 for i in range(len(word))}
+            variants |= frontier
+        return variants
+    
+    def suggest(self, groups, query, limit=10):
+        """
+        검색어와 편집 거리가 가까운 단어 목록 반환
+        
+        Returns:
+            [(단어, 편집 거리, 행 ID 집합), ...] (편집 거리 오름차순, 행이 많은 단어 우선)
+        """
+        query = query.strip().lower()
+        if len(query) < 2:
+            return []
+        max_distance = 1 if len(query) <= FUZZY_SHORT_QUERY_LENGTH else self.max_distance
+        
+        candidates = set()
+        for variant in self._deletes(query[:self.prefix_length], max_distance):
+            candidates |= self.deletes.get(variant, set())
+        
+        suggestions = []
+        for term in candidates:
+            rows = set()
+            for group in groups:
+                rows |= self.term_rows.get(group, {}).get(term, set())
+            if not rows or term == query:
+                continue
+            distance = edit_distance(query, term, max_distance)
+            if distance <= max_distance:
+                suggestions.append((term, distance, rows))
+        
+        suggestions.sort(key=lambda item: (item[1], -len(item[2]), item[0]))
+        return suggestions[:limit]
+
+def rank_tokens(text):
+    """
+    관련도 계산용 토큰 목록을 만드는 함수
+    형태소 분석 없이 한글 단어는 2글자 단위(bigram)로, 영문/숫자 단어는 단어 그대로 나눕니다.
+    (예: '디지털 마케팅' → ['디지', '지털', '마케', '케팅'])
+    """
+    tokens = []
+    for word in re.findall(r'\w+', str(text).lower()):
+        if word.isascii() or len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+class BM25Index:
+    """
+    관련도순 검색용 BM25 색인
+    
+    필드(강의 과목, 분야, 학습자 의견)별로 토큰 → {행 ID: 출현 횟수}와 문서 길이를 미리
+    저장해 두고, 검색 시에는 검색어 토큰의 색인 항목만 점수에 더한 뒤 힙으로 상위 k개를 뽑습니다.
+    """
+    
+    def __init__(self):
+        self.postings = defaultdict(dict)     # group -> {token: {row_id: 출현 횟수}}
+        self.row_tokens = defaultdict(dict)   # group -> {row_id: {token: 출현 횟수}}
+        self.lengths = defaultdict(dict)      # group -> {row_id: 토큰 수}
+        self.total_length = defaultdict(int)  # group -> 전체 토큰 수
+    
+    @classmethod
+    def build(cls, df, column_groups):
+        """
+        데이터프레임과 필드별 컬럼으로 색인을 생성
+        """
+        index = cls()
+        for group, cols in column_groups.items():
+            if not cols:
+                continue
+            values = [df[col].tolist() for col in cols]
+            for row_id, row_values in zip(df.index, zip(*values)):
+                index._add_row(group, row_id, row_values)
+        return index
+    
+    def with_changes(self, removed_ids, added_rows):
+        """
+        행 단위 변경분을 반영한 새 색인을 반환 (기존 색인은 수정하지 않음)
+        사전은 LayeredDict로 공유하고, 출현 횟수가 바뀐 토큰의 색인 항목만 새로 만듭니다.
+        """
+        index = type(self)()
+        for group in set(self.postings) | set(added_rows):
+            postings = LayeredDict(self.postings.get(group))
+            row_tokens = LayeredDict(self.row_tokens.get(group))
+            lengths = LayeredDict(self.lengths.get(group))
+            total_length = self.total_length.get(group, 0)
+            new_counts = {row_id: self._row_counts(values) for row_id, values in added_rows.get(group, [])}
+            
+            old_counts = {}
+            for row_id in removed_ids:
+                counts = row_tokens.pop(row_id, None)
+                if not counts:
+                    continue
+                old_counts[row_id] = counts
+                total_length -= lengths.pop(row_id)
+                updated = new_counts.get(row_id, {})
+                for token, tf in counts.items():
+                    if token in updated:
+                        continue  # 출현 횟수는 아래에서 덮어씀
+                    rows = {key: value for key, value in postings[token].items() if key != row_id}
+                    if rows:
+                        postings[token] = rows
+                    else:
+                        del postings[token]
+            
+            for row_id, counts in new_counts.items():
+                if not counts:
+                    continue
+                row_tokens[row_id] = counts
+                lengths[row_id] = sum(counts.values())
+                total_length += lengths[row_id]
+                previous = old_counts.get(row_id, {})
+                for token, tf in counts.items():
+                    if previous.get(token) != tf:
+                        postings[token] = {**postings.get(token, {}), row_id: tf}
+            index.postings[group] = postings
+            index.row_tokens[group] = row_tokens
+            index.lengths[group] = lengths
+            index.total_length[group] = total_length
+        return index
+    
+    @staticmethod
+    def _row_counts(values):
+        counts = defaultdict(int)
+        for value in values:
+            if value is None or pd.isna(value):
+                continue
+            for token in rank_tokens(value):
+                counts[token] += 1
+        return dict(counts)
+    
+    def _add_row(self, group, row_id, values):
+        counts = self._row_counts(values)
+        if not counts:
+            return
+        
+        self.row_tokens[group][row_id] = counts
+        self.lengths[group][row_id] = sum(counts.values())
+        self.total_length[group] += self.lengths[group][row_id]
+        postings = self.postings[group]
+        for token, tf in counts.items():
+            postings.setdefault(token, {})[row_id] = tf
+    
+    def scores(self, groups, query):
+        """
+        검색어 토큰이 하나라도 있는 행의 BM25 점수 딕셔너리 반환 ({행 ID: 점수})
+        """
+        query_tokens = set(rank_tokens(query))
+        scores = defaultdict(float)
+        for group in groups:
+            lengths = self.lengths.get(group)
+            if not lengths:
+                continue
+            weight = RANK_FIELD_WEIGHTS.get(group, 1.0)
+            doc_count = len(lengths)
+            average_length = self.total_length[group] / doc_count
+            postings = self.postings[group]
+            for token in query_tokens:
+                rows = postings.get(token)
+                if not rows:
+                    continue
+                idf = math.log(1 + (doc_count - len(rows) + 0.5) / (len(rows) + 0.5))
+                for row_id, tf in rows.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[row_id] / average_length)
+                    scores[row_id] += weight * idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+class FullTextIndex:
+    """
+    긴 자유 텍스트(학습자 주요 의견, 담당자 의견)용 위치 포함 전문 색인
+    
+    단어 → {행 ID: 단어 위치 목록}을 저장하여 여러 단어 검색어는 연속 위치로 구문 일치를 확인합니다.
+    한국어 조사/어미가 붙은 단어도 찾을 수 있도록 검색어의 각 단어는 정렬된 단어 목록에서
+    접두사로 확장합니다. ('실습 위주' → '실습 위주의 강의')
+    """
+    
+    WORD_PATTERN = re.compile(r'\w+')
+    
+    def __init__(self):
+        self.postings = defaultdict(dict)   # group -> {단어: {row_id: (위치, ...)}}
+        self.row_terms = defaultdict(dict)  # group -> {row_id: (단어, ...)}
+        self._vocabulary = {}               # group -> 정렬된 단어 목록 (조회 시 생성)
+    
+    @classmethod
+    def build(cls, df, column_groups):
+        """
+        데이터프레임과 컬럼 그룹으로 전문 색인을 생성
+        """
+        index = cls()
+        for group, cols in column_groups.items():
+            if not cols:
+                continue
+            values = [df[col].tolist() for col in cols]
+            for row_id, row_values in zip(df.index, zip(*values)):
+                index._add_row(group, row_id, row_values)
+        return index
+    
+    def with_changes(self, removed_ids, added_rows):
+        """
+        행 단위 변경분을 반영한 새 색인을 반환 (기존 색인은 수정하지 않음)
+        """
+        index = type(self)()
+        for group in set(self.postings) | set(added_rows):
+            postings = LayeredDict(self.postings.get(group))
+            row_terms = LayeredDict(self.row_terms.get(group))
+            new_positions = {row_id: self._term_positions(values) for row_id, values in added_rows.get(group, [])}
+            added_terms, removed_terms = set(), set()
+            
+            old_positions = {}
+            for row_id in removed_ids:
+                terms = row_terms.pop(row_id, None)
+                if not terms:
+                    continue
+                old_positions[row_id] = {term: postings[term][row_id] for term in terms}
+                updated = new_positions.get(row_id, {})
+                for term in terms:
+                    if term in updated:
+                        continue  # 위치는 아래에서 덮어씀
+                    rows = {key: positions for key, positions in postings[term].items() if key != row_id}
+                    if rows:
+                        postings[term] = rows
+                    else:
+                        del postings[term]
+                        removed_terms.add(term)
+            
+            for row_id, term_positions in new_positions.items():
+                if not term_positions:
+                    continue
+                row_terms[row_id] = tuple(term_positions)
+                previous = old_positions.get(row_id, {})
+                for term, positions in term_positions.items():
+                    if previous.get(term) == positions:
+                        continue
+                    if term not in postings:
+                        added_terms.add(term)
+                    postings[term] = {**postings.get(term, {}), row_id: positions}
+            
+            index.postings[group] = postings
+            index.row_terms[group] = row_terms
+            # 단어 목록이 그대로면 정렬된 목록을 공유하고, 바뀐 단어만 끼워 넣거나 뺌
+            vocabulary = self._vocabulary.get(group)
+            if vocabulary is not None:
+                added_terms, removed_terms = added_terms - removed_terms, removed_terms - added_terms
+                if removed_terms:
+                    vocabulary = [term for term in vocabulary if term not in removed_terms]
+                elif added_terms:
+                    vocabulary = list(vocabulary)
+                for term in added_terms:
+                    bisect.insort(vocabulary, term)
+                index._vocabulary[group] = vocabulary
+        return index
+    
+    def _term_positions(self, values):
+        term_positions = defaultdict(list)
+        position = 0
+        for value in values:
+            if value is None or pd.isna(value):
+                continue
+            for match in self.WORD_PATTERN.finditer(str(value).lower()):
+                term_positions[match.group(0)].append(position)
+                position += 1
+            # 컬럼 사이에 빈 위치를 두어 컬럼 경계를 넘는 구문 일치 방지
+            position += 1
+        return {term: tuple(positions) for term, positions in term_positions.items()}
+    
+    def _add_row(self, group, row_id, values):
+        term_positions = self._term_positions(values)
+        if not term_positions:
+            return
+        
+        self.row_terms[group][row_id] = tuple(term_positions)
+        postings = self.postings[group]
+        for term, positions in term_positions.items():
+            postings.setdefault(term, {})[row_id] = positions
+    
+    def _prefix_terms(self, group, prefix):
+        # 정렬된 단어 목록에서 접두사가 같은 단어를 이진 탐색으로 찾음
+        vocabulary = self._vocabulary.get(group)
+        if vocabulary is None:
+            vocabulary = sorted(self.postings.get(group, {}))
+            self._vocabulary[group] = vocabulary
+        start = bisect.bisect_left(vocabulary, prefix)
+        end = bisect.bisect_left(vocabulary, prefix + '\U0010ffff')
+        return vocabulary[start:end]
+    
+    def search(self, group, query):
+        """
+        검색어(단어 또는 구문)가 있는 행 ID 집합 반환
+        """
+        words = self.WORD_PATTERN.findall(query.lower())
+        postings = self.postings.get(group)
+        if not words or not postings:
+            return set()
+        
+        # 단어별로 접두사 확장한 단어들의 {row_id: 위치 집합}
+        word_rows = []
+        for word in words:
+            terms = self._prefix_terms(group, word)
+            if not terms:
+                return set()
+            if len(terms) == 1:
+                # 확장된 단어가 하나면 색인 항목을 그대로 사용 (복사 없음)
+                word_rows.append(postings[terms[0]])
+                continue
+            rows = defaultdict(set)
+            for term in terms:
+                for row_id, positions in postings[term].items():
+                    rows[row_id].update(positions)
+            word_rows.append(rows)
+        
+        # 가장 작은 목록에서 시작하여 후보 행을 좁힘
+        candidates = set(min(word_rows, key=len))
+        for rows in word_rows:
+            candidates = {row_id for row_id in candidates if row_id in rows}
+        if len(words) == 1:
+            return candidates
+        
+        # 구문: 모든 단어가 연속된 위치에 있는 행만 남김
+        matched = set()
+        for row_id in candidates:
+            starts = word_rows[0][row_id]
+            for offset, rows in enumerate(word_rows[1:], 1):
+                starts = {start for start in starts if start + offset in rows[row_id]}
+                if not starts:
+                    break
+            if starts:
+                matched.add(row_id)
+        return matched
+    
+    @classmethod
+    def phrase_pattern(cls, query):
+        """
+        색인 없이 스캔할 때 쓰는 같은 규칙(단어 접두사 + 연속 단어)의 정규식 문자열
+        """
+        words = cls.WORD_PATTERN.findall(query.lower())
+        if not words:
+            return r'(?!)'
+        return r'(?<!\w)' + r'\w*\W+'.join(re.escape(word) for word in words)
+    
+    @classmethod
+    def scan(cls, df, columns, query):
+        """
+        색인 없이 컬럼을 스캔하여 구문이 있는 행 위치 배열을 반환
+        (pandas 문자열 정규식 엔진에 따라 \\w 의미가 달라지지 않도록 파이썬 re로 직접 검사)
+        """
+        pattern = re.compile(cls.phrase_pattern(query))
+        mask = np.zeros(len(df), dtype=bool)
+        for col in columns:
+            mask |= np.fromiter(
+                (isinstance(value, str) and pattern.search(value.lower()) is not None for value in df[col].tolist()),
+                dtype=bool, count=len(df),
+            )
+        return np.flatnonzero(mask)
+
+@dataclass(frozen=True)
+class RowDelta:
+    """
+    이전 데이터 대비 행 단위 변경분 (행 ID 목록)
+    """
+    inserted: list  # 새로 추가된 행
+    updated: list   # 내용이 바뀐 행 (식별 키가 같아 행 ID 유지)
+    deleted: list   # 삭제된 행
+    
+    @property
+    def empty(self):
+        return not (self.inserted or self.updated or self.deleted)
+
+def compute_row_delta(old_hashes, old_keys, new_hashes, new_keys, next_row_id):
+    """
+    이전/새 데이터의 행 해시를 비교하여 행 단위 변경분을 계산하는 함수
+    
+    Args:
+        old_hashes, old_keys: 이전 데이터의 행 ID별 해시와 식별 키 (Series)
+        new_hashes, new_keys: 새 데이터의 행 위치별 해시와 식별 키 (배열)
+        next_row_id: 새로 추가되는 행에 부여할 첫 행 ID
+        
+    Returns:
+        (새 데이터의 행 위치별 행 ID 배열, RowDelta)
+    """
+    old_values = old_hashes.to_numpy()
+    old_ids = old_hashes.index.to_numpy()
+    new_hashes = np.asarray(new_hashes)
+    row_ids = np.full(len(new_hashes), -1, dtype=np.int64)
+    
+    # 같은 위치의 해시가 같은 행은 비교 없이 유지하고 나머지 행만 짝지음
+    # (행 수가 같으면 해시가 다른 위치만, 다르면 앞뒤로 같은 구간을 뺀 가운데 구간만)
+    if len(old_values) == len(new_hashes):
+        same = old_values == new_hashes
+        row_ids[same] = old_ids[same]
+        old_selected = new_selected = np.flatnonzero(~same)
+    else:
+        shared = min(len(old_values), len(new_hashes))
+        mismatch = np.flatnonzero(old_values[:shared] != new_hashes[:shared])
+        prefix = int(mismatch[0]) if len(mismatch) else shared
+        mismatch = np.flatnonzero(old_values[::-1][:shared - prefix] != new_hashes[::-1][:shared - prefix])
+        suffix = int(mismatch[0]) if len(mismatch) else shared - prefix
+        row_ids[:prefix] = old_ids[:prefix]
+        row_ids[len(new_hashes) - suffix:] = old_ids[len(old_values) - suffix:]
+        old_selected = np.arange(prefix, len(old_values) - suffix)
+        new_selected = np.arange(prefix, len(new_hashes) - suffix)
+    
+    # 해시가 같은 행은 그대로 유지 (같은 내용의 행이 여러 개면 등장 순서대로 짝지음)
+    old = pd.DataFrame({'hash': old_values[old_selected], 'row_id': old_ids[old_selected]})
+    old['occurrence'] = old.groupby('hash').cumcount()
+    new = pd.DataFrame({'hash': new_hashes[new_selected], 'position': new_selected})
+    new['occurrence'] = new.groupby('hash').cumcount()
+    merged = new.merge(old, on=['hash', 'occurrence'], how='outer', indicator=True)
+    
+    matched = merged[merged['_merge'] == 'both']
+    row_ids[matched['position'].to_numpy(dtype=np.int64)] = matched['row_id'].to_numpy(dtype=np.int64)
+    
+    removed_ids = merged.loc[merged['_merge'] == 'right_only', 'row_id'].to_numpy(dtype=np.int64)
+    added_positions = merged.loc[merged['_merge'] == 'left_only', 'position'].to_numpy(dtype=np.int64)
+    
+    # 삭제/추가된 행 중 식별 키가 같은 행은 수정으로 간주하여 행 ID 유지
+    removed = pd.DataFrame({'key': old_keys.reindex(removed_ids).to_numpy(), 'row_id': removed_ids}).dropna()
+    removed['occurrence'] = removed.groupby('key').cumcount()
+    added = pd.DataFrame({'key': np.asarray(new_keys, dtype=object)[added_positions], 'position': added_positions}).dropna()
+    added['occurrence'] = added.groupby('key').cumcount()
+    pairs = added.merge(removed, on=['key', 'occurrence'])
+    row_ids[pairs['position'].to_numpy(dtype=np.int64)] = pairs['row_id'].to_numpy(dtype=np.int64)
+    
+    updated = sorted(pairs['row_id'].astype(int).tolist())
+    updated_set = set(updated)
+    deleted = sorted(int(row_id) for row_id in removed_ids if row_id not in updated_set)
+    
+    # 남은 행은 새 행 ID를 부여하여 추가
+    inserted_positions = np.flatnonzero(row_ids == -1)
+    row_ids[inserted_positions] = np.arange(next_row_id, next_row_id + len(inserted_positions))
+    inserted = row_ids[inserted_positions].tolist()
+    
+    return row_ids, RowDelta(inserted=inserted, updated=updated, deleted=deleted)
+
+def parse_satisfaction(series):
+    """
+    만족도 텍스트를 5점 만점 기준 숫자로 변환하는 함수 (변환할 수 없으면 NaN)
+    '4.8' → 4.8, '4.5/5' → 4.5, '9/10' → 4.5, '96%' → 4.8, '96' → 4.8 (5를 넘는 값은 100점 만점으로 간주)
+    """
+    parts = series.astype('string').str.extract(r'(\d+(?:\.\d+)?)\s*(?:(%)|/\s*(\d+(?:\.\d+)?))?')
+    value = pd.to_numeric(parts[0], errors='coerce').astype(float)
+    scale = pd.to_numeric(parts[2], errors='coerce').astype(float)
+    
+    score = value.copy()
+    has_scale = scale.notna() & (scale > 0)
+    score[has_scale] = value[has_scale] / scale[has_scale] * 5
+    is_percent = parts[1].notna() | (~has_scale & (value > 5))
+    score[is_percent] = value[is_percent] / 100 * 5
+    return score.where((score >= 0) & (score <= 5)).to_numpy(dtype=float)
+
+def facet_codes(series):
+    """
+    컬럼 값을 정수 코드 배열과 값 목록으로 변환하는 함수 (결측값 코드는 -1)
+    범주형 컬럼은 이미 있는 카테고리 코드를 그대로 사용합니다.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    return pd.factorize(series)
+
+class SatisfactionIndex:
+    """
+    만족도 점수 정렬 색인
+    
+    로드 시 만족도 텍스트를 5점 만점 점수로 한 번만 변환하고, 점수순으로 정렬한 행 위치 배열을
+    저장합니다. 범위 조회(4.5점 이상)와 분야별 상위 N명은 이진 탐색과 슬라이싱으로 계산합니다.
+    """
+    
+    # 분야별 정렬 배열을 만들 필드
+    FIELDS = ('main_field', 'sub_field')
+    
+    def __init__(self, scores, field_orders=None, order=None):
+        self.scores = scores  # 행 위치별 점수 (없으면 NaN)
+        if order is None:
+            valid = np.flatnonzero(~np.isnan(scores))
+            order = valid[np.argsort(scores[valid], kind='stable')]
+        self.order = order  # 점수 오름차순 행 위치 (같은 점수는 행 위치 오름차순)
+        self.sorted_scores = scores[self.order]
+        self.field_orders = field_orders or {}  # (field, 값) -> 점수 오름차순 행 위치
+    
+    @classmethod
+    def build(cls, frame, schema):
+        """
+        데이터프레임으로 만족도 점수와 정렬 배열을 생성
+        """
+        if not schema.satisfaction:
+            return cls(np.full(len(frame), np.nan))
+        
+        index = cls(parse_satisfaction(frame[schema.satisfaction]))
+        for field in cls.FIELDS:
+            col = getattr(schema, field)
+            if not col:
+                continue
+            codes, values = facet_codes(frame[col])
+            # 점수순 배열을 분야 코드로 안정 정렬하면 분야별로 묶이고 각 묶음 안은 점수순 유지
+            order_codes = codes[index.order]
+            grouped = np.argsort(order_codes, kind='stable')
+            sorted_codes = order_codes[grouped]
+            grouped_positions = index.order[grouped]
+            for code, value in enumerate(values):
+                start, end = np.searchsorted(sorted_codes, [code, code + 1])
+                if end > start:
+                    index.field_orders[(field, value)] = grouped_positions[start:end]
+        return index
+    
+    def with_changes(self, position_map, changed_positions, changed_scores, changed_fields, size):
+        """
+        행 단위 변경분을 반영한 새 색인을 반환 (기존 색인은 수정하지 않음)
+        
+        position_map: 이전 행 위치별 새 행 위치 (삭제/수정된 행은 -1)
+        changed_positions: 추가/수정된 행의 새 행 위치 배열
+        changed_scores: 추가/수정된 행의 점수 배열
+        changed_fields: {field: 추가/수정된 행의 분야 값 배열}
+        size: 새 데이터의 행 수
+        
+        남은 행은 정렬 순서를 그대로 옮기고, 바뀐 행만 이진 탐색으로 끼워 넣습니다.
+        (바뀐 행이 SATISFACTION_PATCH_MAX_ROWS를 넘거나 행 순서가 바뀌었으면 다시 정렬)
+        """
+        kept = np.flatnonzero(position_map >= 0)
+        scores = np.full(size, np.nan)
+        scores[position_map[kept]] = self.scores[kept]
+        scores[changed_positions] = changed_scores
+        
+        added = ~np.isnan(changed_scores)
+        # 남은 행의 상대 순서가 그대로여야 같은 점수 안의 행 위치 순서도 유지됨
+        patch = len(changed_positions) <= SATISFACTION_PATCH_MAX_ROWS and bool(np.all(np.diff(position_map[kept]) > 0))
+        
+        def merged(old_order, added_positions):
+            remapped = position_map[old_order]
+            remapped = remapped[remapped >= 0]
+            if patch:
+                return self._insert_sorted(scores, remapped, added_positions)
+            positions = np.concatenate([remapped, added_positions])
+            return positions[np.lexsort((positions, scores[positions]))]
+        
+        field_orders = {}
+        for (field, value), order in self.field_orders.items():
+            values = changed_fields.get(field)
+            added_positions = changed_positions[added & (values == value)] if values is not None else changed_positions[:0]
+            order = merged(order, added_positions)
+            if len(order):
+                field_orders[(field, value)] = order
+        for field, values in changed_fields.items():
+            for value in pd.unique(values[added]):
+                if pd.isna(value) or (field, value) in self.field_orders:
+                    continue
+                field_orders[(field, value)] = merged(
+                    self.order[:0], changed_positions[added & (values == value)]
+                )
+        
+        return type(self)(scores, field_orders, merged(self.order, changed_positions[added]))
+    
+    @staticmethod
+    def _insert_sorted(scores, order, positions):
+        # (점수, 행 위치) 순으로 정렬된 order에 positions를 이진 탐색으로 끼워 넣음
+        if not len(positions):
+            return order
+        positions = positions[np.lexsort((positions, scores[positions]))]
+        order_scores = scores[order]
+        starts = np.searchsorted(order_scores, scores[positions], 'left')
+        ends = np.searchsorted(order_scores, scores[positions], 'right')
+        slots = [start + np.searchsorted(order[start:end], position) for start, end, position in zip(starts, ends, positions)]
+        return np.insert(order, slots, positions)
+    
+    def range(self, low=None, high=None, include_low=True, include_high=True):
+        """
+        점수가 범위 안에 있는 행 위치 배열 반환 (점수 오름차순, 이진 탐색)
+        """
+        start = 0 if low is None else np.searchsorted(self.sorted_scores, low, 'left' if include_low else 'right')
+        end = len(self.order) if high is None else np.searchsorted(
+            self.sorted_scores, high, 'right' if include_high else 'left'
+        )
+        return self.order[start:end]
+    
+    def top(self, n, field=None, value=None, keys=None):
+        """
+        만족도 상위 n개 행 위치 반환 (점수 내림차순)
+        field/value: 지정하면 해당 분야 안에서의 상위 n개
+        keys: 행 위치별 강사 식별 키 (지정하면 같은 강사는 한 번만 포함)
+        """
+        n = max(int(n), 1)
+        order = self.order if field is None else self.field_orders.get((field, value), self.order[:0])
+        if keys is None:
+            return order[::-1][:n]
+        
+        positions = []
+        seen = set()
+        for position in order[::-1]:
+            key = keys[position]
+            if key is not None and key in seen:
+                continue
+            seen.add(key)
+            positions.append(position)
+            if len(positions) == n:
+                break
+        return np.array(positions, dtype=np.int64)
+
+class FacetIndex:
+    """
+    검색 결과 좁히기(패싯)용 값별 불리언 배열
+    
+    대분야/소분야/직업/만족도 구간의 값마다 행 위치(position) 기준 불리언 배열을 미리 만들어 두고,
+    필터와 값별 개수는 배열 AND/합계로만 계산합니다. (데이터프레임을 다시 스캔하지 않음)
+    """
+    
+    def __init__(self, masks):
+        self.masks = masks  # facet -> {값: 불리언 배열}
+    
+    @classmethod
+    def build(cls, frame, schema, satisfaction_scores=None):
+        """
+        데이터프레임으로 패싯별 값 배열을 생성 (범주형 컬럼은 카테고리 코드로 생성)
+        satisfaction_scores: 행 위치별 만족도 점수 (지정하지 않으면 만족도 컬럼을 변환)
+        """
+        masks = {}
+        for facet in FACET_LABELS:
+            if facet == 'satisfaction':
+                if schema.satisfaction:
+                    if satisfaction_scores is None:
+                        satisfaction_scores = parse_satisfaction(frame[schema.satisfaction])
+                    masks[facet] = cls._satisfaction_masks(satisfaction_scores)
+                continue
+            col = getattr(schema, facet)
+            if not col:
+                continue
+            codes, values = facet_codes(frame[col])
+            masks[facet] = {
+                value: mask for value, mask in ((value, codes == code) for code, value in enumerate(values)) if mask.any()
+            }
+        return cls(masks)
+    
+    def with_changes(self, position_map, changed_positions, changed_values, size):
+        """
+        행 단위 변경분을 반영한 새 색인을 반환 (기존 색인은 수정하지 않음)
+        
+        position_map: 이전 행 위치별 새 행 위치 (삭제/수정된 행은 -1)
+        changed_positions: 추가/수정된 행의 새 행 위치 배열
+        changed_values: {facet: 추가/수정된 행의 값 배열} (만족도는 구간 이름)
+        size: 새 데이터의 행 수
+        
+        행 위치가 그대로면(수정만 있으면) 바뀐 행이 없는 값의 배열은 복사하지 않고 공유합니다.
+        """
+        removed = np.flatnonzero(position_map < 0)
+        kept = np.flatnonzero(position_map >= 0)
+        same_positions = len(position_map) == size and bool(np.all(position_map[kept] == kept))
+        
+        masks = {}
+        for facet, value_masks in self.masks.items():
+            values = changed_values.get(facet)
+            if values is None:
+                values = np.full(len(changed_positions), None, dtype=object)
+            touched_values = set(pd.unique(values[pd.notna(values)]))
+            facet_masks = {}
+            for value, mask in value_masks.items():
+                touched = value in touched_values or bool(mask[removed].any())
+                if same_positions and not touched:
+                    facet_masks[value] = mask
+                    continue
+                if same_positions:
+                    new_mask = mask.copy()
+                else:
+                    new_mask = np.zeros(size, dtype=bool)
+                    new_mask[position_map[kept]] = mask[kept]
+                new_mask[changed_positions] = values == value
+                if not touched or new_mask.any():
+                    facet_masks[value] = new_mask
+            for value in touched_values - set(value_masks):
+                new_mask = np.zeros(size, dtype=bool)
+                new_mask[changed_positions] = values == value
+                facet_masks[value] = new_mask
+            masks[facet] = facet_masks
+        return type(self)(masks)
+    
+    @staticmethod
+    def satisfaction_labels(scores):
+        """
+        행별 만족도 점수를 구간 이름 배열로 변환 (어느 구간에도 없으면 None)
+        """
+        labels = np.full(len(scores), None, dtype=object)
+        for label, low, high in SATISFACTION_BANDS:
+            labels[(scores >= low) & (scores < high)] = label
+        labels[np.isnan(scores)] = SATISFACTION_UNKNOWN_LABEL
+        return labels
+    
+    @staticmethod
+    def _satisfaction_masks(scores):
+        masks = {label: (scores >= low) & (scores < high) for label, low, high in SATISFACTION_BANDS}
+        masks[SATISFACTION_UNKNOWN_LABEL] = np.isnan(scores)
+        # 해당하는 행이 없는 구간(예: 만족도가 모두 있으면 '정보 없음')은 만들지 않음
+        return {label: mask for label, mask in masks.items() if mask.any()}
+    
+    def mask(self, selections, size, skip=None):
+        """
+        선택한 값들의 행 위치 불리언 배열 반환 (패싯 안에서는 OR, 패싯끼리는 AND)
+        skip: 계산에서 제외할 패싯 (값별 개수를 셀 때 자기 자신의 선택은 제외)
+        """
+        combined = np.ones(size, dtype=bool)
+        for facet, values in selections.items():
+            if facet == skip or not values or facet not in self.masks:
+                continue
+            facet_mask = np.zeros(size, dtype=bool)
+            for value in values:
+                if value in self.masks[facet]:
+                    facet_mask |= self.masks[facet][value]
+            combined &= facet_mask
+        return combined
+    
+    def counts(self, base, selections):
+        """
+        현재 결과(base)와 다른 패싯의 선택을 기준으로 패싯별 값 개수 반환
+        개수가 0인 값은 제외합니다. (이미 선택한 값은 0이어도 포함)
+        
+        Returns:
+            {facet: {값: 개수}} (개수 내림차순)
+        """
+        counts = {}
+        for facet, value_masks in self.masks.items():
+            scope = base & self.mask(selections, len(base), skip=facet)
+            selected = selections.get(facet) or ()
+            facet_counts = {}
+            for value, mask in value_masks.items():
+                count = int(np.count_nonzero(scope & mask))
+                if count or value in selected:
+                    facet_counts[value] = count
+            counts[facet] = dict(sorted(facet_counts.items(), key=lambda item: -item[1]))
+        return counts
+
+class InstructorDataset:
+    """
+    한 데이터 버전의 강사 데이터와 파생 구조(컬럼 스키마, 검색 색인, 통계)를 묶은 객체
+    
+    데이터가 바뀌면 행 해시를 비교하여 추가/수정/삭제된 행만 색인과 통계에 반영한
+    새 객체를 만듭니다. 기존 객체는 수정하지 않으므로 다른 세션에서 안전하게 계속 읽을 수 있습니다.
+    
+    모든 세션이 복사 없이 같은 객체를 참조하는 읽기 전용 데이터입니다. 세션 쪽에는 행 ID만
+    저장하고, pandas Copy-on-Write 덕분에 꺼낸 행을 수정해도 공유 데이터에는 반영되지 않습니다.
+    """
+    
+    def __init__(self, frame, schema, index, choseong_index, fuzzy_index, rank_index, fulltext_index, stats,
+                 row_hashes, delta=None, satisfaction=None, facets=None):
+        self.frame = frame
+        self.schema = schema
+        self.index = index
+        self.choseong_index = choseong_index  # 강사이름/강의과목 초성 색인
+        self.fuzzy_index = fuzzy_index        # 강사이름/강의과목 오타 교정 색인
+        self.rank_index = rank_index          # 강의과목/분야/학습자 의견 BM25 색인
+        self.fulltext_index = fulltext_index  # 학습자 주요 의견/담당자 의견 위치 포함 전문 색인
+        if satisfaction is None:
+            satisfaction = SatisfactionIndex.build(frame, schema)
+        if facets is None:
+            facets = FacetIndex.build(frame, schema, satisfaction.scores)
+        self.satisfaction = satisfaction  # 만족도 점수 정렬 색인 (행 위치 기준)
+        self.facets = facets              # 결과 좁히기용 값별 불리언 배열 (행 위치 기준)
+        self.stats = stats
+        self.row_hashes = row_hashes  # 행 ID별 내용 해시
+        self.delta = delta            # 이전 데이터 대비 변경분 (전체 생성 시 None)
+        self._roster_keys = None      # 명단 일괄 조회용 정규화 이름/이메일 (처음 조회할 때 생성)
+    
+    @property
+    def version(self):
+        return self.frame.attrs.get('data_version')
+    
+    @property
+    def indexed(self):
+        """
+        텍스트 검색 색인이 있는지 여부 (없으면 검색은 컬럼 스캔, 관련도순/오타 교정 없음)
+        """
+        return self.index is not None
+    
+    @property
+    def roster_keys(self):
+        """
+        명단 일괄 조회용 행 ID별 정규화 이름/이메일과 대표 행 ID (처음 사용할 때 한 번만 생성)
+        """
+        if self._roster_keys is None:
+            self._roster_keys = build_roster_keys(self.frame, self.schema)
+        return self._roster_keys
+    
+    @classmethod
+    def build(cls, frame, text_indexes=True):
+        """
+        데이터프레임 전체로 스키마, 색인, 통계를 생성
+        text_indexes: False이면 텍스트 검색 색인(n-gram, 초성, 오타 교정, BM25, 전문)은 만들지 않음
+        (만족도/패싯 배열과 통계는 항상 생성, 색인은 나중에 with_text_indexes로 추가)
+        """
+        schema = resolve_column_schema(frame.columns)
+        dataset = cls(
+            frame=frame,
+            schema=schema,
+            index=None,
+            choseong_index=None,
+            fuzzy_index=None,
+            rank_index=None,
+            fulltext_index=None,
+            stats=compute_instructor_stats(frame, schema),
+            row_hashes=compute_row_hashes(frame),
+        )
+        return dataset.with_text_indexes() if text_indexes else dataset
+    
+    def with_text_indexes(self):
+        """
+        텍스트 검색 색인을 만든 새 데이터셋을 반환 (데이터, 통계, 만족도/패싯 배열은 공유)
+        """
+        frame, schema = self.frame, self.schema
+        column_groups = schema.search_groups()
+        return type(self)(
+            frame=frame,
+            schema=schema,
+            index=NgramIndex.build(frame, column_groups),
+            choseong_index=ChoseongIndex.build(
+                frame, {group: cols for group, cols in column_groups.items() if group in CHOSEONG_SEARCH_GROUPS}
+            ),
+            fuzzy_index=FuzzyIndex.build(
+                frame, {group: cols for group, cols in column_groups.items() if group in FUZZY_SEARCH_GROUPS}
+            ),
+            rank_index=BM25Index.build(frame, schema.rank_groups()),
+            fulltext_index=FullTextIndex.build(frame, schema.fulltext_groups()),
+            stats=self.stats,
+            row_hashes=self.row_hashes,
+            delta=self.delta,
+            satisfaction=self.satisfaction,
+            facets=self.facets,
+        )
+    
+    def apply_changes(self, new_frame):
+        """
+        새로 받은 데이터와 비교하여 변경분만 반영한 새 데이터셋을 반환
+        컬럼 구성이 바뀌었거나 이전 데이터(또는 검색 색인)가 없으면 전체를 다시 생성합니다.
+        
+        검색 색인은 바뀐 행의 색인 항목만, 만족도 정렬 배열과 패싯 배열은 바뀐 행의 위치만 고칩니다.
+        (만족도 텍스트 변환도 바뀐 행만 수행)
+        """
+        if self.frame.empty or not self.indexed or list(new_frame.columns) != list(self.frame.columns):
+            return type(self).build(new_frame)
+        
+        schema = self.schema
+        new_hashes = compute_row_hashes(new_frame).to_numpy()
+        new_keys = build_identity_keys(new_frame, schema).to_numpy()
+        next_row_id = int(self.frame.index.max()) + 1 if len(self.frame) else 0
+        row_ids, delta = compute_row_delta(
+            self.row_hashes, self.stats.identity_keys, new_hashes, new_keys, next_row_id
+        )
+        
+        # 새 데이터(시트 순서 유지)에 안정적인 행 ID 부여
+        new_frame.index = pd.Index(row_ids)
+        row_hashes = pd.Series(new_hashes, index=new_frame.index)
+        
+        # 색인에서 뺄 행(삭제/수정)과 다시 넣을 행(추가/수정)
+        removed_ids = delta.deleted + delta.updated
+        changed_ids = delta.inserted + delta.updated
+        
+        # 행 위치 기준 색인용: 이전 행 위치별 새 행 위치 (삭제/수정된 행은 -1)와 바뀐 행의 새 위치
+        new_ids = pd.Index(row_ids)
+        position_map = new_ids.get_indexer(self.frame.index)
+        position_map[self.frame.index.get_indexer(delta.updated)] = -1
+        changed_positions = np.sort(new_ids.get_indexer(changed_ids)).astype(np.int64)
+        changed = new_frame.iloc[changed_positions]
+        
+        def rows_for(column_groups, groups=None):
+            # 색인별 컬럼 그룹의 추가/수정 행 값: {group: [(row_id, 컬럼 값들), ...]}
+            added_rows = {}
+            for group, cols in column_groups.items():
+                if cols and changed_ids and (groups is None or group in groups):
+                    values = changed[cols].itertuples(index=False, name=None)
+                    added_rows[group] = list(zip(changed.index, values))
+            return added_rows
+        
+        if schema.satisfaction:
+            changed_scores = parse_satisfaction(changed[schema.satisfaction])
+            satisfaction = self.satisfaction.with_changes(
+                position_map, changed_positions, changed_scores,
+                {
+                    field: changed[getattr(schema, field)].to_numpy(dtype=object)
+                    for field in SatisfactionIndex.FIELDS if getattr(schema, field)
+                },
+                len(new_frame),
+            )
+        else:
+            changed_scores = np.full(len(changed_positions), np.nan)
+            satisfaction = SatisfactionIndex(np.full(len(new_frame), np.nan))
+        facets = self.facets.with_changes(
+            position_map, changed_positions,
+            {
+                facet: FacetIndex.satisfaction_labels(changed_scores) if facet == 'satisfaction'
+                else changed[getattr(schema, facet)].to_numpy(dtype=object)
+                for facet in self.facets.masks
+            },
+            len(new_frame),
+        )
+        
+        search_groups = schema.search_groups()
+        return type(self)(
+            frame=new_frame,
+            schema=schema,
+            index=self.index.with_changes(removed_ids, rows_for(search_groups)),
+            choseong_index=self.choseong_index.with_changes(removed_ids, rows_for(search_groups, CHOSEONG_SEARCH_GROUPS)),
+            fuzzy_index=self.fuzzy_index.with_changes(removed_ids, rows_for(search_groups, FUZZY_SEARCH_GROUPS)),
+            rank_index=self.rank_index.with_changes(removed_ids, rows_for(schema.rank_groups())),
+            fulltext_index=self.fulltext_index.with_changes(removed_ids, rows_for(schema.fulltext_groups())),
+            stats=update_instructor_stats(
+                self.stats, self.frame, new_frame, schema, delta, pd.Series(new_keys, index=new_frame.index)
+            ),
+            row_hashes=row_hashes,
+            delta=delta,
+            satisfaction=satisfaction,
+            facets=facets,
+        )
+
+def search_instructors(df, query, search_type='all', index=None, regex=False, schema=None, choseong_index=None,
+                       satisfaction_index=None, fulltext_index=None):
+    """
+    강사를 검색하는 함수
+    search_type: 'name' (강사이름), 'field' (대분야/소분야), 'subject' (강의 과목), 'feedback' (의견), 'all' (전체)
+    index: NgramIndex (지정하면 전체 스캔 없이 역색인으로 후보 행을 찾음)
+    regex: True이면 검색어를 정규식으로 처리 (기본값은 문자 그대로 부분 일치)
+    schema: InstructorSchema (지정하지 않으면 컬럼명에서 새로 계산)
+    choseong_index: ChoseongIndex (강사이름/강의과목의 초성·입력 중인 글자 검색에 사용)
+    satisfaction_index: SatisfactionIndex (조건 검색의 만족도 범위 조회에 사용)
+    fulltext_index: FullTextIndex (학습자 주요 의견/담당자 의견 구문 검색에 사용)
+    
+    정규식 검색이 아니면 강사이름/강의과목에서 초성('ㄱㅇㅁ')과 입력 중인 마지막 글자('김야')도 매칭합니다.
+    검색어에 필드 지정(subject:마케팅)이나 AND/OR/NOT, 따옴표가 있으면 조건 검색으로 처리합니다.
+    (잘못된 조건식은 QuerySyntaxError 발생)
+    """
+    if df.empty or not query:
+        return pd.DataFrame()
+    
+    if schema is None:
+        schema = resolve_column_schema(df.columns)
+    
+    if not regex and is_boolean_query(query):
+        node = parse_search_query(query)
+        mask = evaluate_search_query(
+            node, df, search_type, index=index, schema=schema, choseong_index=choseong_index,
+            satisfaction_index=satisfaction_index, fulltext_index=fulltext_index,
+        )
+        return drop_duplicate_instructors(df.iloc[np.flatnonzero(mask)], schema)
+    
+    if regex:
+        try:
+            re.compile(query)
+        except re.error:
+            # 잘못된 정규식은 검색 결과 없음으로 처리
+            return pd.DataFrame()
+    
+    positions = match_positions(
+        df, query, SEARCH_TYPE_GROUPS.get(search_type, []),
+        index=index, regex=regex, schema=schema, choseong_index=choseong_index, fulltext_index=fulltext_index,
+    )
+    return drop_duplicate_instructors(df.iloc[positions], schema)
+
+def match_positions(df, query, groups, index=None, regex=False, schema=None, choseong_index=None,
+                    fulltext_index=None):
+    """
+    컬럼 그룹들에서 검색어가 포함된 행 위치(position) 배열을 반환하는 함수 (시트 순서)
+    의견 그룹은 단어 단위 구문 검색입니다 (각 단어는 접두사 일치라 '위주'가 '위주의'와도 매칭).
+    """
+    partial_pattern = None if regex else hangul_partial_pattern(query.lower())
+    
+    if index is not None and not regex:
+        # 역색인 조회: 모든 그룹 결과를 합집합으로 모음
+        row_ids = set()
+        for group in groups:
+            if group in FULLTEXT_SEARCH_GROUPS:
+                if fulltext_index is not None:
+                    row_ids |= fulltext_index.search(group, query)
+                else:
+                    positions = FullTextIndex.scan(df, schema.fulltext_groups()[group], query)
+                    row_ids |= set(df.index[positions])
+            elif partial_pattern is not None and choseong_index is not None and group in CHOSEONG_SEARCH_GROUPS:
+                # 초성 색인으로 후보를 찾고 원문을 음절 범위로 검증 (일반 부분 일치 결과 포함)
+                row_ids |= choseong_index.lookup_partial(group, query, partial_pattern, index.texts.get(group, {}))
+            else:
+                row_ids |= index.lookup(group, query)
+        positions = df.index.get_indexer(list(row_ids))
+        return np.sort(positions[positions >= 0])
+    
+    positions = np.array([], dtype=np.int64)
+    for group in groups:
+        if group in FULLTEXT_SEARCH_GROUPS and not regex:
+            # 의견은 색인과 같은 단어 단위 구문 규칙의 정규식으로 스캔
+            positions = np.union1d(positions, FullTextIndex.scan(df, schema.fulltext_groups()[group], query))
+            continue
+        positions = np.union1d(positions, scan_instructors(df, query, group, regex=regex, schema=schema))
+        if partial_pattern is not None and group in CHOSEONG_SEARCH_GROUPS:
+            partial_positions = scan_instructors(df, partial_pattern.pattern, group, regex=True, schema=schema)
+            positions = np.union1d(positions, partial_positions)
+    return positions
+
+class QuerySyntaxError(ValueError):
+    """
+    조건 검색어를 해석할 수 없을 때 발생하는 예외
+    """
+
+# 조건 검색의 필드 이름 (영문/한글) → 검색 대상
+QUERY_FIELD_ALIASES = {
+    'name': 'name', '이름': 'name', '강사': 'name',
+    'field': 'field', '분야': 'field',
+    'subject': 'subject', '과목': 'subject',
+    'job': 'job', '직업': 'job',
+    'affiliation': 'affiliation', '소속': 'affiliation',
+    'feedback': 'feedback', '의견': 'feedback',
+    'satisfaction': 'satisfaction', '만족도': 'satisfaction',
+}
+QUERY_OPERATORS = ('AND', 'OR', 'NOT')
+
+_QUERY_TOKEN_PATTERN = re.compile(r'"([^"]*)"?|\(|\)|[^\s()"]+')
+
+def is_boolean_query(query):
+    """
+    검색어가 조건 검색(필드 지정, AND/OR/NOT, 따옴표 구문)인지 확인하는 함수
+    """
+    if '"' in query:
+        return True
+    for word in query.split():
+        if word in QUERY_OPERATORS or (word.startswith('-') and len(word) > 1):
+            return True
+        field, separator, _ = word.partition(':')
+        if separator and field.lower() in QUERY_FIELD_ALIASES:
+            return True
+    return False
+
+def _tokenize_search_query(query):
+    # (종류, 값) 토큰 목록: ('op', 'AND'), ('(', None), ('field', 'subject'), ('text', '마케팅')
+    tokens = []
+    for match in _QUERY_TOKEN_PATTERN.finditer(query):
+        word = match.group(0)
+        if match.group(1) is not None or word.startswith('"'):
+            tokens.append(('text', match.group(1) or ''))
+        elif word in ('(', ')'):
+            tokens.append((word, None))
+        elif word in QUERY_OPERATORS:
+            tokens.append(('op', word))
+        else:
+            if word.startswith('-') and len(word) > 1:
+                tokens.append(('op', 'NOT'))
+                word = word[1:]
+            field, separator, rest = word.partition(':')
+            if separator and field.lower() in QUERY_FIELD_ALIASES:
+                tokens.append(('field', QUERY_FIELD_ALIASES[field.lower()]))
+                if rest:
+                    tokens.append(('text', rest))
+            else:
+                tokens.append(('text', word))
+    return tokens
+
+def parse_search_query(query):
+    """
+    조건 검색어를 구문 트리로 변환하는 함수
+    
+    문법: 필드 지정(subject:마케팅, 과목:"디지털 마케팅"), 따옴표 구문, AND(생략 가능)/OR/NOT(또는 -), 괄호
+    (예: 'subject:마케팅 AND field:전략 NOT job:학생')
+    
+    Returns:
+        ('or', [노드]) / ('and', [노드]) / ('not', 노드) / ('term', 필드 또는 None, 검색어)
+    """
+    tokens = _tokenize_search_query(query)
+    position = 0
+    
+    def peek():
+        return tokens[position] if position < len(tokens) else (None, None)
+    
+    def take():
+        nonlocal position
+        token = peek()
+        position += 1
+        return token
+    
+    def parse_or():
+        nodes = [parse_and()]
+        while peek() == ('op', 'OR'):
+            take()
+            nodes.append(parse_and())
+        return nodes[0] if len(nodes) == 1 else ('or', nodes)
+    
+    def parse_and():
+        nodes = [parse_unary()]
+        while True:
+            kind, value = peek()
+            if (kind, value) == ('op', 'AND'):
+                take()
+                nodes.append(parse_unary())
+            elif kind in ('text', 'field', '(') or (kind, value) == ('op', 'NOT'):
+                # 연산자 없이 이어진 조건은 AND
+                nodes.append(parse_unary())
+            else:
+                break
+        return nodes[0] if len(nodes) == 1 else ('and', nodes)
+    
+    def parse_unary():
+        kind, value = take()
+        if (kind, value) == ('op', 'NOT'):
+            return ('not', parse_unary())
+        if kind == '(':
+            node = parse_or()
+            if take()[0] != ')':
+                raise QuerySyntaxError("괄호가 닫히지 않았습니다.")
+            return node
+        if kind == 'field':
+            text_kind, text = take()
+            if text_kind != 'text' or not text:
+                raise QuerySyntaxError(f"'{value}:' 뒤에 검색어가 필요합니다.")
+            return ('term', value, text)
+        if kind == 'text':
+            if not value:
+                raise QuerySyntaxError("빈 따옴표는 검색할 수 없습니다.")
+            return ('term', None, value)
+        if kind is None:
+            raise QuerySyntaxError("조건식이 완성되지 않았습니다.")
+        raise QuerySyntaxError(f"'{value or kind}' 위치에 검색어가 필요합니다.")
+    
+    node = parse_or()
+    if position < len(tokens):
+        raise QuerySyntaxError(f"해석할 수 없는 부분이 있습니다: '{tokens[position][1] or tokens[position][0]}'")
+    return node
+
+def parse_satisfaction_condition(text):
+    """
+    만족도 조건을 범위로 변환하는 함수
+    '>=4.5', '>4', '<3.5', '<=4', '4..5' (양 끝 포함), '4.8' (같은 점수)
+    
+    Returns:
+        (low, high, include_low, include_high)
+    """
+    match = re.fullmatch(r'(>=|<=|>|<|=)?\s*(\d+(?:\.\d+)?)', text.strip())
+    if match:
+        operator, value = match.group(1) or '=', float(match.group(2))
+        return {
+            '>=': (value, None, True, True),
+            '>': (value, None, False, True),
+            '<=': (None, value, True, True),
+            '<': (None, value, True, False),
+            '=': (value, value, True, True),
+        }[operator]
+    
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)\.\.(\d+(?:\.\d+)?)', text.strip())
+    if match:
+        return float(match.group(1)), float(match.group(2)), True, True
+    raise QuerySyntaxError(f"만족도 조건은 '>=4.5', '<4', '4..5' 형식으로 입력해주세요: '{text}'")
+
+def evaluate_search_query(node, df, search_type='all', index=None, schema=None, choseong_index=None,
+                          satisfaction_index=None, fulltext_index=None):
+    """
+    조건 검색 구문 트리를 행 위치 기준 불리언 배열로 계산하는 함수
+    필드를 지정하지 않은 검색어는 선택한 검색 범위(search_type)에서 찾습니다.
+    """
+    children_args = (df, search_type, index, schema, choseong_index, satisfaction_index, fulltext_index)
+    kind = node[0]
+    if kind == 'or':
+        mask = np.zeros(len(df), dtype=bool)
+        for child in node[1]:
+            mask |= evaluate_search_query(child, *children_args)
+        return mask
+    if kind == 'and':
+        mask = np.ones(len(df), dtype=bool)
+        for child in node[1]:
+            mask &= evaluate_search_query(child, *children_args)
+        return mask
+    if kind == 'not':
+        return ~evaluate_search_query(node[1], *children_args)
+    
+    _, field, text = node
+    mask = np.zeros(len(df), dtype=bool)
+    if field == 'satisfaction':
+        # 만족도 범위: 정렬 색인에서 이진 탐색
+        if satisfaction_index is None:
+            satisfaction_index = SatisfactionIndex.build(df, schema)
+        mask[satisfaction_index.range(*parse_satisfaction_condition(text))] = True
+    elif field is None or field in SEARCH_TYPE_GROUPS:
+        # 강사이름/분야/강의과목/의견: 역색인(초성, 전문 색인 포함) 조회
+        groups = SEARCH_TYPE_GROUPS.get(field or search_type, [])
+        mask[match_positions(
+            df, text, groups, index=index, schema=schema,
+            choseong_index=choseong_index, fulltext_index=fulltext_index,
+        )] = True
+    else:
+        # 직업/소속: 컬럼 직접 비교 (범주형 컬럼은 카테고리 코드로 계산)
+        col = getattr(schema, field)
+        if col:
+            mask |= column_contains(df[col], text)
+    return mask
+
+def drop_duplicate_instructors(results, schema):
+    """
+    검색 결과에서 중복 강사를 제거하는 함수
+    """
+    # 중복 제거 - 이름과 이메일 주소가 같은 경우 동일인물로 판단
+    if not results.empty:
+        if schema.name and schema.email:
+            # 이름과 이메일을 기준으로 중복 제거
+            results = results.drop_duplicates(subset=[schema.name, schema.email], keep='first')
+        else:
+            # 이름이나 이메일 정보가 없는 경우 일반 중복 제거
+            results = results.drop_duplicates()
+    
+    return results
+
+def rank_instructors(df, query, search_type, rank_index, schema, top_k=RANK_TOP_K, mask=None):
+    """
+    관련도순 검색 함수 - BM25 점수가 높은 강사 상위 top_k명을 반환
+    전체를 정렬하지 않고 점수 힙에서 중복 강사를 건너뛰며 top_k명이 찰 때까지만 꺼냅니다.
+    mask: 행 위치별 불리언 배열 (지정하면 True인 행 중에서만 상위 top_k명을 뽑음, 결과 좁히기용)
+    
+    Returns:
+        (점수순 검색 결과 데이터프레임, 검색어 토큰이 포함된 전체 행 ID 배열 - mask 적용 전)
+    """
+    scores = rank_index.scores(RANK_SEARCH_TYPE_GROUPS.get(search_type, []), query)
+    hit_row_ids = np.fromiter(scores, dtype=np.int64, count=len(scores))
+    candidates = hit_row_ids
+    if mask is not None:
+        candidates = hit_row_ids[mask[df.index.get_indexer(hit_row_ids)]]
+    heap = [(-scores[row_id], row_id) for row_id in candidates.tolist()]
+    heapq.heapify(heap)
+    
+    row_ids = []
+    seen = set()
+    while heap and len(row_ids) < top_k:
+        _, row_id = heapq.heappop(heap)
+        if schema.name and schema.email:
+            # 이름과 이메일이 같은 강사는 점수가 가장 높은 행만 사용
+            key = tuple(
+                None if pd.isna(value) else value
+                for value in (df.at[row_id, schema.name], df.at[row_id, schema.email])
+            )
+        else:
+            key = row_id
+        if key in seen:
+            continue
+        seen.add(key)
+        row_ids.append(row_id)
+    
+    return df.loc[row_ids], hit_row_ids
+
+def fuzzy_search_instructors(df, query, search_type, fuzzy_index, schema):
+    """
+    오타 교정 검색 함수 - 검색어와 편집 거리가 가장 가까운 이름/과목의 강사를 반환
+    
+    Returns:
+        (검색 결과 데이터프레임, 교정된 검색어 목록)
+    """
+    groups = [group for group in SEARCH_TYPE_GROUPS.get(search_type, []) if group in FUZZY_SEARCH_GROUPS]
+    suggestions = fuzzy_index.suggest(groups, query) if groups else []
+    if not suggestions:
+        return pd.DataFrame(), ()
+    
+    # 가장 가까운 편집 거리의 단어들만 사용
+    best_distance = suggestions[0][1]
+    best = [(term, rows) for term, distance, rows in suggestions if distance == best_distance]
+    row_ids = set().union(*(rows for _, rows in best))
+    positions = df.index.get_indexer(list(row_ids))
+    results = df.iloc[np.sort(positions[positions >= 0])]
+    return drop_duplicate_instructors(results, schema), tuple(term for term, _ in best)
+
+def scan_instructors(df, query, search_type='all', regex=False, schema=None):
+    """
+    역색인 없이 컬럼을 직접 스캔하여 매칭되는 행 위치(position) 배열을 반환하는 함수
+    모든 컬럼의 매칭 결과를 하나의 불리언 마스크로 OR 결합하므로 행이 중복 복사되지 않습니다.
+    """
+    if schema is None:
+        schema = resolve_column_schema(df.columns)
+    column_groups = {**schema.search_groups(), **schema.fulltext_groups()}
+    
+    # 검색 타입에 따라 컬럼별 마스크를 하나로 결합
+    combined = np.zeros(len(df), dtype=bool)
+    for group in SEARCH_TYPE_GROUPS.get(search_type, []):
+        for col in column_groups.get(group, []):
+            combined |= column_contains(df[col], query, regex=regex)
+    
+    return np.flatnonzero(combined)
+
+def column_contains(series, query, regex=False):
+    """
+    컬럼 값에 검색어가 포함되는지 불리언 배열로 반환하는 함수
+    범주형 컬럼은 고유 카테고리에서만 매칭한 뒤 정수 코드로 행에 펼칩니다.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories.astype(str).to_series()
+        matched = categories.str.contains(query, case=False, regex=regex, na=False).to_numpy(dtype=bool)
+        codes = series.cat.codes.to_numpy()
+        # 결측값(코드 -1)은 매칭되지 않음
+        return np.append(matched, False)[codes]
+    
+    values = series.fillna('').astype(str)
+    return values.str.contains(query, case=False, regex=regex, na=False).to_numpy(dtype=bool)
+
+def normalize_person_names(values):
+    """
+    이름 비교용 정규화 (유니코드 NFKC, 괄호 설명/호칭 제거, 공백 제거, 소문자)
+    '김 양민', '김양민(A대학교)', '김양민 교수님'은 모두 '김양민'이 됩니다.
+    """
+    names = pd.Series(values, dtype=object).astype('string').str.normalize('NFKC')
+    names = names.str.replace(r'\(.*?\)', '', regex=True).str.replace(ROSTER_NAME_SUFFIX_PATTERN, '', regex=True)
+    names = names.str.replace(r'\s+', '', regex=True).str.lower()
+    return names.mask(names == '')
+
+def normalize_emails(values):
+    """
+    이메일 비교용 정규화 (유니코드 NFKC, 공백 제거, 소문자)
+    """
+    emails = pd.Series(values, dtype=object).astype('string').str.normalize('NFKC').str.strip().str.lower()
+    return emails.mask(emails == '')
+
+def build_roster_keys(df, schema):
+    """
+    시트 강사의 정규화 이름/이메일 표를 만드는 함수 (행 ID 인덱스)
+    identity 컬럼은 같은 강사(정규화 이름 + 이메일)의 첫 번째 행 ID입니다.
+    """
+    names = normalize_person_names(df[schema.name]) if schema.name else pd.Series(pd.NA, index=df.index, dtype='string')
+    emails = normalize_emails(df[schema.email]) if schema.email else pd.Series(pd.NA, index=df.index, dtype='string')
+    keys = pd.DataFrame({'name_key': names.to_numpy(), 'email_key': emails.to_numpy(), 'row_id': df.index}, index=df.index)
+    keys['identity'] = keys.groupby(['name_key', 'email_key'], dropna=False, sort=False)['row_id'].transform('first')
+    return keys
+
+def guess_roster_columns(columns):
+    """
+    명단 파일에서 이름 컬럼과 이메일 컬럼을 추정하는 함수 (이름 컬럼이 없으면 첫 번째 컬럼)
+    """
+    columns = [str(col) for col in columns]
+    email = next((col for col in columns if 'mail' in col.lower() or '이메일' in col), None)
+    name = next(
+        (col for col in columns if col != email and any(x in col.lower() for x in ['이름', '성명', 'name'])),
+        next((col for col in columns if col != email), None),
+    )
+    return name, email
+
+def read_roster_file(file, filename):
+    """
+    명단 파일(CSV/XLSX)을 읽는 함수 (모든 값을 문자열로 읽음)
+    """
+    extension = filename.rsplit('.', 1)[-1].lower()
+    if extension in ('xlsx', 'xls'):
+        return pd.read_excel(file, dtype=str)
+    return pd.read_csv(file, dtype=str)
+
+def match_roster(dataset, names, emails=None):
+    """
+    명단(이름, 선택적으로 이메일)을 시트 강사와 한 번에 대조하는 함수
+    
+    정규화한 이름으로 시트 전체와 해시 조인하고 (이메일을 입력했으면 이메일까지 같은 강사를 우선),
+    이름이 없는 항목은 이메일로 다시 조인합니다. 그래도 없는 이름만 오타 교정 색인으로
+    비슷한 이름 후보를 찾습니다.
+    
+    Returns:
+        명단 순서의 결과 데이터프레임
+        (roster_position, input_name, input_email, status, basis, distance, row_id)
+        한 항목에 후보가 여러 명이면(동명이인, 비슷한 이름) 후보마다 한 행씩 포함됩니다.
+    """
+    names = pd.Series(list(names), dtype=object)
+    emails = pd.Series([None] * len(names) if emails is None else list(emails), dtype=object)
+    roster = pd.DataFrame({
+        'roster_position': np.arange(len(names)),
+        'input_name': names,
+        'input_email': emails,
+        'name_key': normalize_person_names(names),
+        'email_key': normalize_emails(emails),
+    })
+    keys = dataset.roster_keys
+    
+    # 1) 이름 조인 - 이메일까지 같은 후보가 있으면 그 후보만 남김 (동명이인 구분)
+    by_name = roster.dropna(subset=['name_key']).merge(keys.dropna(subset=['name_key']), on='name_key',
+                                                       suffixes=('', '_sheet'))
+    same_email = (by_name['email_key'] == by_name['email_key_sheet']).fillna(False).to_numpy(dtype=bool)
+    has_same_email = pd.Series(same_email).groupby(by_name['roster_position'].to_numpy()).transform('any').to_numpy()
+    by_name = by_name.assign(basis=np.where(same_email, 'name_email', 'name'))[same_email | ~has_same_email]
+    
+    # 2) 이름이 다른 항목은 이메일 조인 (영문 이름, 표기 차이 등)
+    rest = roster[~roster['roster_position'].isin(by_name['roster_position'])].dropna(subset=['email_key'])
+    by_email = rest.merge(keys.dropna(subset=['email_key']), on='email_key', suffixes=('', '_sheet'))
+    by_email = by_email.assign(basis='email')
+    
+    columns = ['roster_position', 'basis', 'identity']
+    matched = pd.concat([by_name[columns], by_email[columns]], ignore_index=True).assign(status='matched', distance=0)
+    
+    # 3) 남은 이름은 오타 교정 색인의 비슷한 이름 후보 (색인 생성 전에는 건너뜀)
+    fuzzy_positions, fuzzy_rows, fuzzy_distances = [], [], []
+    unmatched = roster[~roster['roster_position'].isin(matched['roster_position'])].dropna(subset=['name_key'])
+    if dataset.fuzzy_index is None:
+        unmatched = unmatched.iloc[:0]
+    for position, name_key in zip(unmatched['roster_position'], unmatched['name_key']):
+        for _, distance, rows in dataset.fuzzy_index.suggest(['name'], name_key, limit=ROSTER_FUZZY_CANDIDATES):
+            fuzzy_positions += [position] * len(rows)
+            fuzzy_rows += rows
+            fuzzy_distances += [distance] * len(rows)
+    fuzzy = pd.DataFrame({
+        'roster_position': np.array(fuzzy_positions, dtype=np.int64),
+        'identity': keys['identity'].reindex(fuzzy_rows).to_numpy(),
+        'distance': fuzzy_distances,
+    }).dropna(subset=['identity']).assign(basis='fuzzy', status='fuzzy')
+    
+    candidates = pd.concat([matched, fuzzy], ignore_index=True).drop_duplicates(['roster_position', 'identity'])
+    result = roster[['roster_position', 'input_name', 'input_email']].merge(candidates, on='roster_position', how='left')
+    result['status'] = result['status'].fillna('unknown')
+    result['row_id'] = result.pop('identity').astype('Int64')
+    result['distance'] = result['distance'].astype('Int64')
+    return result.sort_values(['roster_position', 'distance'], kind='stable', ignore_index=True)
+
+def roster_report(dataset, matches):
+    """
+    명단 대조 결과에 시트 강사 정보(이름, 이메일, 소속, 직업, 강의 과목, 분야, 만족도)를 붙인 표
+    """
+    report = pd.DataFrame({
+        '순번': matches['roster_position'] + 1,
+        '입력 이름': matches['input_name'],
+        '입력 이메일': matches['input_email'],
+        '결과': matches['status'].map(ROSTER_STATUS_LABELS),
+        '일치 기준': matches['basis'].map(ROSTER_BASIS_LABELS),
+    })
+    schema = dataset.schema
+    sheet_columns = [
+        col for col in (schema.name, schema.email, schema.affiliation, schema.job, schema.subject,
+                        schema.main_field, schema.sub_field, schema.satisfaction)
+        if col
+    ]
+    row_ids = matches['row_id'].astype(object).where(matches['row_id'].notna(), None)
+    sheet = dataset.frame[sheet_columns].reindex(row_ids.tolist())
+    for col in sheet_columns:
+        report[f'시트 {col}' if col in report else col] = sheet[col].astype(object).to_numpy()
+    return report
+
+@dataclass(frozen=True)
+class SearchResult:
+    """
+    검색어, 검색 범위, 데이터 버전으로 식별되는 검색 결과
+    메인 결과 목록과 사이드바가 같은 객체를 공유하여 검색을 한 번만 실행합니다.
+    
+    세션에는 행 ID만 저장하고, 실제 행은 프로세스 전체가 공유하는 데이터에서 필요할 때 꺼내 씁니다.
+    """
+    query: str
+    search_type: str
+    data_version: str
+    row_ids: np.ndarray  # 검색 결과 행 ID (시트 순서, 관련도순이면 점수순)
+    hit_row_ids: np.ndarray = None  # 결과 좁히기/상위 k명 자르기 전 전체 결과 행 ID (없으면 row_ids와 같음)
+    corrected_terms: tuple = ()  # 결과가 없어 오타 교정으로 찾은 경우 교정된 검색어
+    ranked: bool = False         # 관련도순 검색 여부
+    matched_count: int = None    # 관련도순 검색에서 검색어가 포함된 전체 행 수
+    structured: bool = False     # 조건 검색(필드 지정, AND/OR/NOT) 여부
+    error: str = None            # 조건 검색어를 해석할 수 없을 때의 오류 메시지
+    indexed: bool = True         # 검색 색인으로 검색했는지 여부 (False면 색인 생성 전 컬럼 스캔)
+    
+    @property
+    def key(self):
+        return (self.query, self.search_type, self.data_version, self.ranked, self.indexed)
+    
+    @property
+    def empty(self):
+        return len(self.row_ids) == 0
+    
+    def __len__(self):
+        return len(self.row_ids)
+    
+    def positions(self, df):
+        """
+        공유 데이터에서 결과 행의 위치(position) 배열을 구하는 함수 (데이터에 없는 행 ID는 무시)
+        """
+        positions = df.index.get_indexer(self.row_ids)
+        return positions[positions >= 0]
+    
+    def rows(self, df):
+        """
+        공유 데이터에서 결과 행을 꺼내는 함수
+        """
+        return df.iloc[self.positions(df)]
+    
+    def hit_mask(self, df):
+        """
+        결과 좁히기 전 전체 결과의 행 위치 불리언 배열 (관련도순이면 상위 k명으로 자르기 전의 모든 강사)
+        패싯 값별 개수는 이 배열을 기준으로 셉니다.
+        """
+        row_ids = self.row_ids if self.hit_row_ids is None else self.hit_row_ids
+        positions = df.index.get_indexer(row_ids)
+        mask = np.zeros(len(df), dtype=bool)
+        mask[positions[positions >= 0]] = True
+        return mask
+
+def resolve_ranked(query, search_type, ranked, rank_index=None):
+    """
+    관련도순 검색을 실제로 적용할지 판단하는 함수
+    조건 검색, 강사이름 검색, BM25 색인이 없는 경우에는 시트 순서 검색을 사용합니다.
+    """
+    return bool(
+        ranked and rank_index is not None and search_type in RANK_SEARCH_TYPE_GROUPS and not is_boolean_query(query)
+    )
+
+def run_search(dataset, query, search_type='all', ranked=False, facet_mask=None):
+    """
+    데이터셋의 색인으로 검색을 실행하여 SearchResult를 반환하는 함수
+    ranked가 True이면 BM25 관련도 상위 강사만 점수순으로 반환합니다 (강사이름 검색은 제외).
+    일치하는 강사가 없으면 오타 교정 색인으로 가장 비슷한 이름/과목의 강사를 찾습니다.
+    facet_mask: 결과 좁히기 필터 (행 위치별 불리언 배열, 관련도순이면 상위 k명을 뽑기 전에 적용)
+    """
+    df, schema = dataset.frame, dataset.schema
+    structured = is_boolean_query(query)
+    ranked = resolve_ranked(query, search_type, ranked, dataset.rank_index)
+    
+    matched_count = None
+    error = None
+    masked = False  # 결과에 facet_mask가 이미 적용되었는지 여부
+    if ranked:
+        results, hit_row_ids = rank_instructors(df, query, search_type, dataset.rank_index, schema, mask=facet_mask)
+        matched_count = len(hit_row_ids)
+        # 패싯 개수용 전체 결과 (시트 순서, 강사 중복 제거)
+        hit_positions = np.sort(df.index.get_indexer(hit_row_ids))
+        hit_row_ids = drop_duplicate_instructors(df.iloc[hit_positions], schema).index.to_numpy()
+        masked = True
+    else:
+        try:
+            results = search_instructors(
+                df, query, search_type, index=dataset.index, schema=schema, choseong_index=dataset.choseong_index,
+                satisfaction_index=dataset.satisfaction, fulltext_index=dataset.fulltext_index,
+            )
+        except QuerySyntaxError as e:
+            results, error = pd.DataFrame(), str(e)
+        hit_row_ids = results.index.to_numpy()
+    corrected_terms = ()
+    if not len(hit_row_ids) and dataset.fuzzy_index is not None and not structured:
+        results, corrected_terms = fuzzy_search_instructors(df, query, search_type, dataset.fuzzy_index, schema)
+        hit_row_ids = results.index.to_numpy()
+        masked = False
+    if facet_mask is not None and not masked and not results.empty:
+        results = results.iloc[np.flatnonzero(facet_mask[df.index.get_indexer(results.index)])]
+    
+    return SearchResult(
+        query=query,
+        search_type=search_type,
+        data_version=dataset.version,
+        row_ids=results.index.to_numpy(),
+        hit_row_ids=hit_row_ids,
+        corrected_terms=corrected_terms,
+        ranked=ranked,
+        matched_count=matched_count,
+        structured=structured,
+        error=error,
+        indexed=dataset.indexed,
+    )
+
+# HTTP 엔드포인트 기본 주소
+SEARCH_API_HOST = '127.0.0.1'
+SEARCH_API_PORT = 8502
+
+# 검색 API 결과 수 (limit을 지정하지 않을 때의 기본값, 최대값)
+SEARCH_API_DEFAULT_LIMIT = 50
+SEARCH_API_MAX_LIMIT = 500
+
+def instructor_records(dataset, positions):
+    """
+    행 위치 배열의 강사 정보를 JSON으로 보낼 수 있는 dict 목록으로 변환하는 함수
+    결측값은 None, 범주형 값은 문자열로 바꾸고 행 ID와 환산 만족도 점수를 함께 담습니다.
+    """
+    rows = dataset.frame.iloc[positions]
+    columns = [str(col) for col in rows.columns]
+    scores = dataset.satisfaction.scores[positions]
+    
+    records = []
+    for row_id, score, values in zip(rows.index, scores, rows.itertuples(index=False, name=None)):
+        records.append({
+            'row_id': int(row_id),
+            'satisfaction_score': None if np.isnan(score) else round(float(score), 2),
+            'data': {
+                col: None if pd.isna(value) else value.item() if isinstance(value, np.generic) else value
+                for col, value in zip(columns, values)
+            },
+        })
+    return records
+
+class InstructorSearchEngine:
+    """
+    Streamlit 없이 강사 데이터를 검색하는 엔진
+    
+    데이터 보관소(InstructorStore)로 만들면 갱신 주기마다 최신 시트를 받아 교체하고,
+    데이터프레임/CSV/스냅샷으로 만들면 그 데이터를 그대로 검색합니다.
+    데이터셋은 읽기 전용이므로 여러 스레드에서 동시에 검색해도 안전합니다.
+    
+        engine = InstructorSearchEngine.from_csv('instructors.csv')
+        engine.search('마케팅', search_type='subject', limit=10)
+    """
+    
+    def __init__(self, dataset=None, store=None):
+        if dataset is None and store is None:
+            raise ValueError("dataset 또는 store가 필요합니다.")
+        self._dataset = dataset
+        self.store = store
+    
+    @classmethod
+    def from_frame(cls, df):
+        """
+        데이터프레임으로 엔진 생성 (컬럼명 정리, 범주형 변환 후 색인 생성)
+        """
+        return cls(dataset=InstructorDataset.build(prepare_instructor_frame(df)))
+    
+    @classmethod
+    def from_csv(cls, path):
+        """
+        구글 시트에서 다운로드한 CSV 파일로 엔진 생성
+        """
+        return cls.from_frame(pd.read_csv(path))
+    
+    @classmethod
+    def from_snapshot(cls, path=SNAPSHOT_PATH):
+        """
+        로컬 스냅샷 파일로 엔진 생성 (파일이 없으면 FileNotFoundError)
+        """
+        df = read_instructor_snapshot(path)
+        if df is None:
+            raise FileNotFoundError(path)
+        return cls(dataset=InstructorDataset.build(df))
+    
+    @classmethod
+    def from_sheet(cls, sources=None, check_revision=None, snapshot_path=SNAPSHOT_PATH):
+        """
+        구글 시트로 엔진 생성 (스냅샷을 즉시 사용하고 최신 데이터는 백그라운드에서 갱신)
+        """
+        store = InstructorStore(lambda: fetch_instructor_data(sources), check_revision=check_revision,
+                                snapshot_path=snapshot_path)
+        return cls(store=store.start())
+    
+    @property
+    def dataset(self):
+        if self.store is not None:
+            self.store.maybe_refresh()
+            return self.store.dataset
+        return self._dataset
+    
+    def search(self, query, search_type='all', ranked=False, limit=None):
+        """
+        검색 결과를 JSON으로 보낼 수 있는 dict로 반환
+        한 번의 검색은 하나의 데이터셋에서만 실행되므로 도중에 데이터가 교체되어도 결과가 섞이지 않습니다.
+        """
+        if search_type not in SEARCH_TYPE_GROUPS:
+            raise ValueError(f"알 수 없는 검색 범위입니다: {search_type}")
+        
+        dataset = self.dataset
+        result = run_search(dataset, query, search_type, ranked)
+        positions = result.positions(dataset.frame)
+        return {
+            'query': result.query,
+            'search_type': result.search_type,
+            'data_version': result.data_version,
+            'ranked': result.ranked,
+            'structured': result.structured,
+            'total': len(positions),
+            'matched_count': result.matched_count,
+            'corrected_terms': list(result.corrected_terms),
+            'error': result.error,
+            'results': instructor_records(dataset, positions[:limit]),
+        }
+    
+    def search_many(self, queries, search_type='all', ranked=False, limit=None):
+        """
+        여러 검색어를 한 번에 검색 (검색어 순서대로 결과 목록 반환)
+        """
+        return [self.search(query, search_type, ranked, limit) for query in queries]
+    
+    def top_satisfaction(self, n=5, main_field=None):
+        """
+        만족도 상위 n명 (main_field를 지정하면 해당 대분야 안에서의 상위 n명)
+        """
+        dataset = self.dataset
+        positions = dataset.satisfaction.top(
+            n,
+            field=None if main_field is None else 'main_field',
+            value=main_field,
+            keys=dataset.stats.identity_keys.to_numpy(),
+        )
+        return instructor_records(dataset, positions)
+    
+    def lookup_roster(self, names, emails=None):
+        """
+        명단 일괄 조회 - 명단 항목별 결과 구분(matched/fuzzy/unknown)과 시트 강사 후보 목록
+        """
+        dataset = self.dataset
+        matches = match_roster(dataset, names, emails)
+        
+        results = []
+        for position, group in matches.groupby('roster_position', sort=True):
+            found = group.dropna(subset=['row_id'])
+            candidates = instructor_records(dataset, dataset.frame.index.get_indexer(found['row_id'].astype(np.int64)))
+            for candidate, basis in zip(candidates, found['basis']):
+                candidate['basis'] = basis
+            input_name, input_email = group['input_name'].iloc[0], group['input_email'].iloc[0]
+            results.append({
+                'position': int(position),
+                'input_name': None if pd.isna(input_name) else str(input_name),
+                'input_email': None if pd.isna(input_email) else str(input_email),
+                'status': group['status'].iloc[0],
+                'candidates': candidates,
+            })
+        return results
+    
+    def health(self):
+        """
+        현재 데이터 상태 (데이터 버전, 행 수, 데이터 소스, 검색 색인 생성 여부)
+        """
+        dataset = self.dataset
+        frame = dataset.frame
+        return {
+            'status': 'ok' if not frame.empty else 'empty',
+            'data_version': frame.attrs.get('data_version'),
+            'rows': len(frame),
+            'source': frame.attrs.get('load_source'),
+            'indexed': dataset.indexed,
+        }
+    
+    def create_server(self, host=SEARCH_API_HOST, port=SEARCH_API_PORT):
+        """
+        JSON 검색 HTTP 서버 생성 (요청마다 스레드에서 처리)
+        """
+        server = ThreadingHTTPServer((host, port), make_request_handler(self))
+        server.daemon_threads = True
+        return server
+    
+    def serve(self, host=SEARCH_API_HOST, port=SEARCH_API_PORT):
+        """
+        JSON 검색 HTTP 서버 실행 (Ctrl+C로 종료할 때까지 대기)
+        """
+        server = self.create_server(host, port)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+def parse_search_options(params):
+    """
+    검색 요청 파라미터(쿼리 문자열 또는 JSON 본문)를 검색 인자로 변환하는 함수
+    잘못된 값이면 ValueError가 발생합니다.
+    """
+    search_type = params.get('type') or params.get('search_type') or 'all'
+    if search_type not in SEARCH_TYPE_GROUPS:
+        raise ValueError(f"알 수 없는 검색 범위입니다: {search_type}")
+    
+    ranked = params.get('ranked', False)
+    if isinstance(ranked, str):
+        ranked = ranked.lower() in ('1', 'true', 'yes', 'on')
+    
+    limit = params.get('limit')
+    try:
+        limit = SEARCH_API_DEFAULT_LIMIT if limit in (None, '') else int(limit)
+    except (TypeError, ValueError):
+        raise ValueError(f"limit은 정수여야 합니다: {limit}")
+    if limit < 0:
+        raise ValueError("limit은 0 이상이어야 합니다.")
+    return search_type, bool(ranked), min(limit, SEARCH_API_MAX_LIMIT)
+
+def make_request_handler(engine):
+    """
+    검색 엔진을 사용하는 HTTP 요청 처리 클래스를 만드는 함수
+    
+    GET  /health                                   데이터 상태
+    GET  /search?q=검색어&type=all&ranked=0&limit=50  검색
+    POST /search {"query": ..., "type": ..., "ranked": ..., "limit": ...}
+                 ({"queries": [...]}이면 여러 검색어를 한 번에 검색)
+    GET  /top?n=5&main_field=대분야                  만족도 상위 강사
+    POST /roster {"names": [...], "emails": [...]}  명단 일괄 조회 (emails는 생략 가능)
+    """
+    class InstructorSearchHandler(BaseHTTPRequestHandler):
+        server_version = 'InstructorSearch/1.0'
+        protocol_version = 'HTTP/1.1'  # keep-alive로 연결 재사용
+        
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            params = dict(urllib.parse.parse_qsl(url.query))
+            if url.path == '/health':
+                self.send_json(200, engine.health())
+            elif url.path == '/search':
+                self.handle_search({**params, 'query': params.get('q') or params.get('query')})
+            elif url.path == '/top':
+                try:
+                    n = int(params.get('n') or 5)
+                except ValueError:
+                    self.send_json(400, {'error': "n은 정수여야 합니다."})
+                    return
+                if n < 1:
+                    self.send_json(400, {'error': "n은 1 이상이어야 합니다."})
+                    return
+                self.send_json(200, {'results': engine.top_satisfaction(min(n, SEARCH_API_MAX_LIMIT),
+                                                                        params.get('main_field') or None)})
+            else:
+                self.send_json(404, {'error': f"알 수 없는 경로입니다: {url.path}"})
+        
+        def do_POST(self):
+            path = urllib.parse.urlsplit(self.path).path
+            if path not in ('/search', '/roster'):
+                self.send_json(404, {'error': f"알 수 없는 경로입니다: {path}"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(payload, dict):
+                    raise ValueError
+            except ValueError:
+                self.send_json(400, {'error': "요청 본문은 JSON 객체여야 합니다."})
+                return
+            if path == '/roster':
+                self.handle_roster(payload)
+            else:
+                self.handle_search(payload)
+        
+        def handle_roster(self, payload):
+            names, emails = payload.get('names'), payload.get('emails')
+            if not isinstance(names, list) or (emails is not None and
+                                               (not isinstance(emails, list) or len(emails) != len(names))):
+                self.send_json(400, {'error': "names는 목록이어야 하며, emails는 names와 길이가 같은 목록이어야 합니다."})
+                return
+            self.send_json(200, {'results': engine.lookup_roster(names, emails)})
+        
+        def handle_search(self, params):
+            try:
+                search_type, ranked, limit = parse_search_options(params)
+            except ValueError as e:
+                self.send_json(400, {'error': str(e)})
+                return
+            
+            queries = params.get('queries')
+            if isinstance(queries, list):
+                queries = [str(query).strip() for query in queries]
+                self.send_json(200, {'results': engine.search_many(queries, search_type, ranked, limit)})
+                return
+            
+            query = str(params.get('query') or '').strip()
+            if not query:
+                self.send_json(400, {'error': "검색어(q 또는 query)가 필요합니다."})
+                return
+            self.send_json(200, engine.search(query, search_type, ranked, limit))
+        
+        def send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            # 요청마다 표준 오류에 로그를 남기지 않음
+            pass
+    
+    return InstructorSearchHandler
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="강사 검색 엔진")
+    data_source = parser.add_mutually_exclusive_group()
+    data_source.add_argument('--csv', help="검색할 CSV 파일 (지정하지 않으면 구글 시트/로컬 스냅샷 사용)")
+    data_source.add_argument('--snapshot', help="검색할 로컬 스냅샷 파일")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    search_parser = commands.add_parser('search', help="검색 결과를 JSON으로 출력")
+    search_parser.add_argument('query', nargs='+', help="검색어 (여러 개면 각각 검색)")
+    search_parser.add_argument('--type', default='all', choices=list(SEARCH_TYPE_GROUPS), help="검색 범위")
+    search_parser.add_argument('--ranked', action='store_true', help="관련도순 검색")
+    search_parser.add_argument('--limit', type=int, default=SEARCH_API_DEFAULT_LIMIT, help="최대 결과 수")
+    
+    serve_parser = commands.add_parser('serve', help="JSON 검색 HTTP 서버 실행")
+    serve_parser.add_argument('--host', default=SEARCH_API_HOST)
+    serve_parser.add_argument('--port', type=int, default=SEARCH_API_PORT)
+    
+    args = parser.parse_args(argv)
+    if args.csv:
+        engine = InstructorSearchEngine.from_csv(args.csv)
+    elif args.snapshot:
+        engine = InstructorSearchEngine.from_snapshot(args.snapshot)
+    else:
+        engine = InstructorSearchEngine.from_sheet()
+    
+    if args.command == 'search':
+        results = engine.search_many(args.query, args.type, args.ranked, args.limit)
+        json.dump(results if len(results) > 1 else results[0], sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write('\n')
+    else:
+        print(f"강사 검색 API: http://{args.host}:{args.port}/search?q=검색어 ({engine.health()['rows']}개 행)")
+        engine.serve(args.host, args.port)
+
+if __name__ == '__main__':
+    main()